@@ -0,0 +1,357 @@
+import numpy as np
+from numpy.random import RandomState, default_rng
+
+from card import DECK_SIZE, FACE_ACES, FACE_VALUES
+from shuffle import Shuffle
+
+# Decks are arrays of card codes (see `Card`), in the order `Deck()`
+# builds them before any shuffling.
+CARD_VALUES = np.array(FACE_VALUES)
+CARD_ACES = np.array(FACE_ACES, dtype=int)
+MAX_SHUFFLE_COUNT = 5
+# Columns of the table returned by `BatchBlackjack.sweep`.
+SWEEP_DTYPE = np.dtype([
+    ('threshold', np.int64),
+    ('rounds', np.int64),
+    ('win_rate', np.float64),
+    ('tie_rate', np.float64),
+    ('loss_rate', np.float64),
+    ('mean_return', np.float64),
+    ('final_wallet', np.float64),
+])
+
+
+class BatchResult:
+    """
+    Per-round outcomes of a batch of Blackjack sessions.
+
+    Every array has one row per session. Rounds that were not played
+    (because the session ran out of cards or money) have `played` set to
+    False and a winner, score and bet of 0.
+
+    Attributes:
+        played: (sessions, num_rounds) bool mask of rounds that were played.
+        winner: (sessions, num_rounds) 1, 0 or -1 as in `determine_winner`.
+        player_score, dealer_score: (sessions, num_rounds) final scores.
+        bet: (sessions, num_rounds) amount bet on each round.
+        wallet: (sessions, num_rounds + 1) wallet before the first round
+            and after every round.
+        rounds_played: (sessions,) number of rounds played.
+    """
+
+    def __init__(self, played, winner, player_score, dealer_score, bet, wallet):
+        self.played = played
+        self.winner = winner
+        self.player_score = player_score
+        self.dealer_score = dealer_score
+        self.bet = bet
+        self.wallet = wallet
+        self.rounds_played = played.sum(axis=1)
+
+
+class BatchBlackjack:
+    """
+    Vectorized Blackjack engine that plays many independent sessions at once.
+
+    Each session behaves like `Blackjack(wallet).play_round(num_rounds,
+    stand_threshold)` run right after `numpy.random.seed(s)` for its seed
+    `s`, but decks are integer arrays and every step of a round is a NumPy
+    operation across all sessions.
+
+    >>> from numpy.random import seed
+    >>> from blackjack import Blackjack
+    >>> seed(20)
+    >>> game = Blackjack(10)
+    >>> game.play_round(1, 15)
+    >>> result = BatchBlackjack(10).play_rounds(1, 15, seeds=20)
+    >>> result.winner, result.player_score, result.dealer_score
+    (array([[1]], dtype=int8), array([[21]]), array([[17]]))
+    >>> result.wallet
+    array([[10, 15]])
+
+    >>> seed(3)
+    >>> game = Blackjack(100)
+    >>> game.play_round(30, 16)
+    >>> result = BatchBlackjack(100).play_rounds(30, 16, seeds=[3, 4])
+    >>> outcomes = {'Player won': 1, 'Player los': -1, 'Player and': 0}
+    >>> winners = [outcomes[line[:10]] for line in game.get_log().split('\\n')
+    ...            if line[:10] in outcomes]
+    >>> winners == list(result.winner[0, result.played[0]])
+    True
+    >>> int(result.wallet[0, -1]) == game.wallet
+    True
+    >>> result.rounds_played
+    array([9, 9])
+    """
+
+    # Composite shuffle permutations indexed by
+    # [cards left, modified_overhand count, mongean count].
+    permutations = None
+
+    def __init__(self, wallet):
+        assert isinstance(wallet, (int, float))
+        self.wallet = wallet
+
+    def build_permutations():
+        """
+        Returns the table of index arrays that `Deck.shuffle` applies for
+        every deck length and pair of shuffle counts `play_round` can draw.
+        Positions past the end of the deck map to themselves.
+        """
+        if BatchBlackjack.permutations is None:
+            counts = MAX_SHUFFLE_COUNT + 1
+            table = np.tile(np.arange(DECK_SIZE), (DECK_SIZE + 1, counts, counts, 1))
+            for length in range(DECK_SIZE + 1):
+                for overhand in range(counts):
+                    for mongean in range(counts):
+                        table[length, overhand, mongean, :length] = \
+                            Shuffle.permutation('modified_overhand', length, overhand)[
+                                Shuffle.permutation('mongean', length, mongean)]
+            BatchBlackjack.permutations = table
+        return BatchBlackjack.permutations
+
+    def calculate_score(hard_total, aces):
+        """
+        Vectorized `Blackjack.calculate_score` from the hard total (Aces
+        counted as 1) and the number of Aces in each hand.
+        """
+        soft_total = hard_total + 10
+        return np.where((aces > 0) & (soft_total <= 21), soft_total, hard_total)
+
+    def determine_winner(player_score, dealer_score):
+        """
+        Vectorized `Blackjack.determine_winner` without the logging.
+        """
+        tie = (player_score == dealer_score) | ((dealer_score > 21) & (player_score > 21))
+        won = ((player_score > dealer_score) | (dealer_score > 21)) & (player_score <= 21)
+        return np.where(tie, 0, np.where(won, 1, -1)).astype(np.int8)
+
+    def play_rounds(self, num_rounds, stand_threshold, seeds, policy=None, fisher_yates=False):
+        """
+        Plays up to `num_rounds` rounds in every session.
+
+        Parameters:
+            num_rounds (int): Number of rounds to play per session.
+            stand_threshold: Score threshold for when the player will
+            stand, as an int or an array with one threshold per session.
+            seeds: An int or a sequence of ints, one per session, seeding
+            the shuffle counts drawn for that session.
+            policy: Optional Policy the player follows instead of
+            `stand_threshold`, as in `Blackjack`.
+            fisher_yates (bool): Shuffle every deck uniformly at random
+            before each round, like `Blackjack(fisher_yates=True)`. The
+            permutations for all sessions come from one Generator seeded
+            with `seeds`, so a session does not match the single game with
+            its seed, but the same seeds always give the same batch.
+        Returns:
+            A `BatchResult`.
+
+        >>> from policy import Policy
+        >>> engine = BatchBlackjack(100)
+        >>> by_threshold = engine.play_rounds(30, 16, seeds=range(20))
+        >>> by_policy = engine.play_rounds(30, 16, seeds=range(20), policy=Policy.threshold(16))
+        >>> bool((by_policy.winner == by_threshold.winner).all())
+        True
+
+        >>> from numpy.random import seed
+        >>> from blackjack import Blackjack
+        >>> seed(6)
+        >>> game = Blackjack(100, verbosity='none', write_summary=False, policy=Policy.basic())
+        >>> winners = [result.winner for result in game.iter_rounds(30, 16)]
+        >>> basic = engine.play_rounds(30, 16, seeds=6, policy=Policy.basic())
+        >>> winners == basic.winner[0, basic.played[0]].tolist()
+        True
+
+        >>> uniform = engine.play_rounds(30, 16, seeds=range(20), fisher_yates=True)
+        >>> again = engine.play_rounds(30, 16, seeds=range(20), fisher_yates=True)
+        >>> bool((uniform.winner == again.winner).all()), uniform.rounds_played[:5]
+        (True, array([ 9,  9, 10,  9, 10]))
+        """
+        assert isinstance(num_rounds, int) and not isinstance(num_rounds, bool)
+        assert isinstance(fisher_yates, bool)
+        seeds = np.atleast_1d(seeds)
+        if fisher_yates:
+            draws = np.zeros((len(seeds), num_rounds, 2), dtype=int)
+            return self.play_draws(draws, stand_threshold, policy, default_rng(seeds.tolist()))
+        draws = BatchBlackjack.shuffle_draws(seeds, num_rounds)
+        return self.play_draws(draws, stand_threshold, policy)
+
+    def sweep(self, num_rounds, seeds, thresholds=range(22)):
+        """
+        Plays the sessions seeded by `seeds` once for every stand threshold
+        in a single vectorized pass. Every threshold sees the same shuffle
+        counts (common random numbers), so differences between thresholds
+        are not swamped by shuffle noise.
+
+        Returns a table with one row per threshold (see SWEEP_DTYPE):
+        rounds played, win/tie/loss rates, mean wallet change per round and
+        mean final wallet.
+
+        >>> engine = BatchBlackjack(100)
+        >>> table = engine.sweep(20, seeds=range(50))
+        >>> len(table), table['threshold'][:3].tolist()
+        (22, [0, 1, 2])
+        >>> single = engine.play_rounds(20, 16, seeds=range(50))
+        >>> int(table['rounds'][16]) == int(single.rounds_played.sum())
+        True
+        >>> float(table['final_wallet'][16]) == float(single.wallet[:, -1].mean())
+        True
+        >>> int(table['threshold'][np.argmax(table['mean_return'])])
+        15
+        """
+        assert isinstance(num_rounds, int) and not isinstance(num_rounds, bool)
+        seeds = np.atleast_1d(seeds)
+        thresholds = np.asarray(thresholds, dtype=int)
+        draws = BatchBlackjack.shuffle_draws(seeds, num_rounds)
+        result = self.play_draws(np.tile(draws, (len(thresholds), 1, 1)),
+                                 np.repeat(thresholds, len(seeds)))
+
+        shape = (len(thresholds), len(seeds) * num_rounds)
+        winner = result.winner.reshape(shape)
+        played = result.played.reshape(shape)
+        rounds = played.sum(axis=1)
+        table = np.zeros(len(thresholds), dtype=SWEEP_DTYPE)
+        table['threshold'] = thresholds
+        table['rounds'] = rounds
+        per_round = np.maximum(rounds, 1)
+        table['win_rate'] = (winner == 1).sum(axis=1) / per_round
+        table['tie_rate'] = (played & (winner == 0)).sum(axis=1) / per_round
+        table['loss_rate'] = (winner == -1).sum(axis=1) / per_round
+        table['mean_return'] = (winner * result.bet.reshape(shape)).sum(axis=1) / per_round
+        table['final_wallet'] = result.wallet[:, -1].reshape(len(thresholds), len(seeds)).mean(axis=1)
+        return table
+
+    def shuffle_draws(seeds, num_rounds):
+        """
+        Returns the (sessions, num_rounds, 2) shuffle counts `play_round`
+        draws after `numpy.random.seed` is called with each seed: the
+        mongean count, then the overhand count.
+        """
+        draws = np.zeros((len(seeds), num_rounds, 2), dtype=int)
+        state = RandomState()
+        for s, session_seed in enumerate(seeds):
+            state.seed(session_seed)
+            draws[s] = state.randint(MAX_SHUFFLE_COUNT + 1, size=(num_rounds, 2))
+        return draws
+
+    def play_draws(self, draws, stand_threshold, policy=None, rng=None):
+        """
+        Plays every session with the shuffle counts in `draws`, as drawn by
+        `shuffle_draws`, and returns a `BatchResult`. With the Generator
+        `rng` every deck gets a uniform Fisher-Yates shuffle instead, and
+        only the shape of `draws` is used.
+        """
+        sessions, num_rounds = draws.shape[:2]
+        stand_threshold = np.asarray(stand_threshold)
+        assert np.issubdtype(stand_threshold.dtype, np.integer)
+        assert stand_threshold.ndim == 0 or stand_threshold.shape == (sessions,)
+        assert ((0 <= stand_threshold) & (stand_threshold <= 21)).all()
+        rows = np.arange(sessions)
+        perms = BatchBlackjack.build_permutations()
+
+        decks = np.tile(np.arange(DECK_SIZE), (sessions, 1))
+        cards_left = np.full(sessions, DECK_SIZE)
+        wallet = np.full(sessions, self.wallet)
+        bet = np.full(sessions, 5)
+        active = np.ones(sessions, dtype=bool)
+
+        played = np.zeros((sessions, num_rounds), dtype=bool)
+        winners = np.zeros((sessions, num_rounds), dtype=np.int8)
+        player_scores = np.zeros((sessions, num_rounds), dtype=int)
+        dealer_scores = np.zeros((sessions, num_rounds), dtype=int)
+        bets = np.zeros((sessions, num_rounds), dtype=int)
+        wallets = np.zeros((sessions, num_rounds + 1), dtype=wallet.dtype)
+        wallets[:, 0] = wallet
+
+        for r in range(num_rounds):
+            bet = np.maximum(bet, 5)
+            active &= (cards_left >= 4) & (wallet >= bet)
+            if not active.any():
+                wallets[:, r + 1:] = wallet[:, None]
+                break
+
+            if rng is None:
+                mongean, overhand = draws[:, r, 0], draws[:, r, 1]
+                order = perms[cards_left, overhand, mongean]
+            else:
+                order = BatchBlackjack.uniform_orders(rng, cards_left)
+            shuffled = np.take_along_axis(decks, order, axis=1)
+            decks = np.where(active[:, None], shuffled, decks)
+
+            player_hard = CARD_VALUES[decks[:, 0]] + CARD_VALUES[decks[:, 2]]
+            player_aces = CARD_ACES[decks[:, 0]] + CARD_ACES[decks[:, 2]]
+            dealer_hard = CARD_VALUES[decks[:, 1]] + CARD_VALUES[decks[:, 3]]
+            dealer_aces = CARD_ACES[decks[:, 1]] + CARD_ACES[decks[:, 3]]
+            position = np.full(sessions, 4)
+
+            player_hard, player_aces, position = BatchBlackjack.hit_or_stand(
+                decks, rows, active, cards_left, position, player_hard, player_aces, stand_threshold,
+                policy, CARD_VALUES[decks[:, 1]])
+            dealer_hard, dealer_aces, position = BatchBlackjack.hit_or_stand(
+                decks, rows, active, cards_left, position, dealer_hard, dealer_aces, 17)
+
+            player_score = BatchBlackjack.calculate_score(player_hard, player_aces)
+            dealer_score = BatchBlackjack.calculate_score(dealer_hard, dealer_aces)
+            winner = np.where(active, BatchBlackjack.determine_winner(player_score, dealer_score), 0)
+
+            played[:, r] = active
+            winners[:, r] = winner
+            player_scores[:, r] = np.where(active, player_score, 0)
+            dealer_scores[:, r] = np.where(active, dealer_score, 0)
+            bets[:, r] = np.where(active, bet, 0)
+
+            wallet = wallet + winner * bet
+            bet = np.where(active, bet + winner * 5, bet)
+            wallets[:, r + 1] = wallet
+
+            # Remove the dealt cards from the front of each deck.
+            used = np.where(active, position, 0)
+            shift = np.minimum(np.arange(DECK_SIZE) + used[:, None], DECK_SIZE - 1)
+            decks = np.take_along_axis(decks, shift, axis=1)
+            cards_left = cards_left - used
+
+        return BatchResult(played, winners, player_scores, dealer_scores, bets, wallets)
+
+    def uniform_orders(rng, cards_left):
+        """
+        Returns one index array per deck that shuffles its first
+        `cards_left` cards uniformly at random, drawn with a single
+        `Shuffle.fisher_yates_many` call. The positions past the end of a
+        deck stay after the shuffled cards.
+
+        >>> orders = BatchBlackjack.uniform_orders(default_rng(2), np.array([52, 5]))
+        >>> sorted(orders[1, :5].tolist()), bool((orders[1, 5:] >= 5).all())
+        ([0, 1, 2, 3, 4], True)
+        """
+        perms = Shuffle.fisher_yates_many(rng, len(cards_left), DECK_SIZE)
+        past = perms >= cards_left[:, None]
+        return np.take_along_axis(perms, np.argsort(past, axis=1, kind='stable'), axis=1)
+
+    def hit_or_stand(decks, rows, active, cards_left, position, hard, aces, stand_threshold,
+                     policy=None, upcard=None):
+        """
+        Vectorized `Blackjack.hit_or_stand`: deals the next card of each
+        deck to every hand whose score is below `stand_threshold` until
+        all hands stand or their decks run out. With a `policy` the hands
+        hit as it decides against the dealer's `upcard` values instead.
+        """
+        hitting = active & (position < cards_left) & \
+            BatchBlackjack.wants_hit(hard, aces, stand_threshold, policy, upcard)
+        while hitting.any():
+            card = decks[rows, np.minimum(position, DECK_SIZE - 1)]
+            hard = hard + np.where(hitting, CARD_VALUES[card], 0)
+            aces = aces + np.where(hitting, CARD_ACES[card], 0)
+            position = position + hitting
+            hitting &= (position < cards_left) & \
+                BatchBlackjack.wants_hit(hard, aces, stand_threshold, policy, upcard)
+        return hard, aces, position
+
+    def wants_hit(hard, aces, stand_threshold, policy, upcard):
+        """
+        Returns which hands take another card: those below `stand_threshold`,
+        or those `policy` says to hit against `upcard`.
+        """
+        score = BatchBlackjack.calculate_score(hard, aces)
+        if policy is None:
+            return score < stand_threshold
+        return policy.decide(score, (aces > 0) & (hard + 10 <= 21), upcard)
@@ -0,0 +1,174 @@
+"""
+Benchmarks for the simulation hot paths.
+
+Times the primitives a round is built from and full `play_round`
+sessions, reporting operations (or rounds) per second and the peak memory
+of each session. Results can be saved as a JSON baseline and later runs
+compared against it:
+
+    python benchmark.py --save baseline.json
+    python benchmark.py --baseline baseline.json --tolerance 10
+
+The comparison exits with status 1 if any benchmark's throughput dropped
+by more than `--tolerance` percent.
+"""
+import argparse
+import json
+import sys
+import time
+import tracemalloc
+
+from numpy.random import default_rng
+
+from blackjack import Blackjack
+from card import Card
+from deck import Deck, Shoe
+from hand import PlayerHand
+from shuffle import Shuffle
+
+
+def time_operation(operation, number, repeat=5):
+    """
+    Returns the best rate, in calls per second, of calling `operation`
+    `number` times, over `repeat` runs.
+    """
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            operation()
+        best = min(best, time.perf_counter() - start)
+    return number / best
+
+
+def primitive_benchmarks():
+    """
+    Returns a dict of benchmark name to (operation, calls per run).
+    """
+    cards = Deck().get_cards()
+    rng = default_rng(0)
+    unsorted_hand = [cards[i] for i in rng.permutation(len(cards))[:8]]
+    scored_hand = PlayerHand()
+    scored_hand.add_card(Card('A', 'spades'), Card(6, 'hearts'), Card(4, 'clubs'))
+
+    def deal_deck():
+        deck = Deck()
+        hand = PlayerHand()
+        for _ in range(len(deck.cards)):
+            deck.deal_hand(hand)
+            hand.cards = []
+
+    return {
+        'shuffle.mongean': (lambda: Shuffle.mongean(cards), 2000),
+        'shuffle.modified_overhand': (lambda: Shuffle.modified_overhand(cards, 5), 2000),
+        'card.lt.sort_hand': (lambda: sorted(unsorted_hand), 5000),
+        'deck.deal_hand.full_deck': (deal_deck, 200),
+        'blackjack.calculate_score': (lambda: Blackjack.calculate_score(scored_hand), 20000),
+    }
+
+
+def session(rounds, stand_threshold):
+    """
+    Plays `rounds` rounds from a six-deck shoe without writing summaries.
+    """
+    game = Blackjack(10 ** 9, rng=default_rng(stand_threshold), deck=Shoe(6), write_summary=False)
+    game.play_round(rounds, stand_threshold)
+    return game
+
+
+def run_benchmarks(rounds=10000, thresholds=(12, 15, 17, 19), repeat=3):
+    """
+    Runs every benchmark and returns a dict of name to results. Each
+    result has `per_second`; sessions also report `peak_kib`. Every session
+    is played once untimed, so the shuffle permutation caches are filled,
+    and then timed as the best of `repeat` runs.
+    """
+    results = {}
+    for name, (operation, number) in primitive_benchmarks().items():
+        results[name] = {'per_second': time_operation(operation, number)}
+    for stand_threshold in thresholds:
+        session(rounds, stand_threshold)
+        per_second = rounds * time_operation(lambda: session(rounds, stand_threshold), 1, repeat)
+        # Measure memory in a separate run, as tracing slows the session.
+        tracemalloc.start()
+        session(rounds, stand_threshold)
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        results[f'play_round.threshold_{stand_threshold}'] = {
+            'per_second': per_second, 'peak_kib': peak / 1024}
+    return results
+
+
+def compare(results, baseline, tolerance):
+    """
+    Returns a list of (name, baseline rate, new rate) for every benchmark
+    whose rate dropped by more than `tolerance` percent. Benchmarks that
+    are missing from either side are ignored.
+
+    >>> baseline = {'a': {'per_second': 100.0}, 'b': {'per_second': 100.0}}
+    >>> results = {'a': {'per_second': 95.0}, 'b': {'per_second': 80.0}}
+    >>> compare(results, baseline, tolerance=10)
+    [('b', 100.0, 80.0)]
+    >>> compare(results, baseline, tolerance=25)
+    []
+    """
+    regressions = []
+    for name, result in results.items():
+        if name not in baseline:
+            continue
+        old = baseline[name]['per_second']
+        new = result['per_second']
+        if new < old * (1 - tolerance / 100):
+            regressions.append((name, old, new))
+    return regressions
+
+
+def format_results(results):
+    """
+    Returns a table of the benchmark results.
+
+    >>> print(format_results({'play_round.threshold_17': {'per_second': 1234.5, 'peak_kib': 10.0}}))
+    play_round.threshold_17              1234.5/s      10.0 KiB peak
+    """
+    lines = []
+    for name, result in results.items():
+        line = f"{name:<30} {result['per_second']:>12.1f}/s"
+        if 'peak_kib' in result:
+            line += f"  {result['peak_kib']:>8.1f} KiB peak"
+        lines.append(line)
+    return '\n'.join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().split('\n')[0])
+    parser.add_argument('--rounds', type=int, default=10000,
+                        help='rounds per play_round session (default 10000)')
+    parser.add_argument('--thresholds', type=int, nargs='+', default=[12, 15, 17, 19],
+                        help='stand thresholds to run sessions at')
+    parser.add_argument('--repeat', type=int, default=3,
+                        help='timed runs per session, keeping the best (default 3)')
+    parser.add_argument('--save', metavar='PATH', help='write the results as a JSON baseline')
+    parser.add_argument('--baseline', metavar='PATH', help='compare against a JSON baseline')
+    parser.add_argument('--tolerance', type=float, default=10.0,
+                        help='allowed throughput drop in percent (default 10)')
+    args = parser.parse_args(argv)
+
+    results = run_benchmarks(args.rounds, tuple(args.thresholds), args.repeat)
+    print(format_results(results))
+    if args.save:
+        with open(args.save, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.tolerance)
+        for name, old, new in regressions:
+            print(f'REGRESSION {name}: {old:.1f}/s -> {new:.1f}/s '
+                  f'({100 * (old - new) / old:.1f}% slower)')
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
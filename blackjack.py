@@ -1,10 +1,82 @@
 from deck import Deck
 from hand import DealerHand, PlayerHand
 from card import Card
+from probability import DealerProbabilities
+from solver import ThresholdSolver
+from summary import SummaryWriter
+from roundlog import RoundLog, result_text
+from profiling import GameStats, profile
+from runningstats import RunningStats
+from policy import Policy
+from probability import BUST
 
-from numpy.random import randint, seed
+from numpy.random import default_rng, randint, seed
 seed(20)
 
+
+class RoundResult:
+    """
+    Outcome of one round, as yielded by `Blackjack.iter_rounds`.
+
+    Attributes:
+        round: Number of the round in the game.
+        player_cards, dealer_cards: Tuples of the cards in each final hand.
+        player_score, dealer_score: Final scores.
+        winner: 1, 0 or -1 as in `determine_winner`.
+        wallet: Wallet after the round was settled.
+        bet: Amount bet on the round.
+    """
+
+    __slots__ = ('round', 'player_cards', 'dealer_cards', 'player_score',
+                 'dealer_score', 'winner', 'wallet', 'bet')
+
+    def __init__(self, round, player_cards, dealer_cards, player_score, dealer_score,
+                 winner, wallet, bet):
+        self.round = round
+        self.player_cards = player_cards
+        self.dealer_cards = dealer_cards
+        self.player_score = player_score
+        self.dealer_score = dealer_score
+        self.winner = winner
+        self.wallet = wallet
+        self.bet = bet
+
+    def __repr__(self):
+        return (f'RoundResult(round={self.round}, player_score={self.player_score}, '
+                f'dealer_score={self.dealer_score}, winner={self.winner}, '
+                f'wallet={self.wallet}, bet={self.bet})')
+
+
+class ReplayRecord:
+    """
+    What `Blackjack.replay_round` needs to play one round again: the
+    shuffles made before it was dealt and the number of cards it used.
+
+    Attributes:
+        round: Number of the round in the game.
+        wallet: Wallet before the round.
+        bet: Amount bet on the round.
+        stand_threshold: Threshold the player stood at.
+        shuffles: List of (Deck method, keyword arguments) for every
+            shuffle or reshuffle since the previous round.
+        dealt: Number of cards dealt after the last shuffle.
+        checkpoint: `Deck.checkpoint` from before the shuffles, kept for
+            the first round and every `Blackjack.REPLAY_INTERVAL` rounds
+            after it; None for the others.
+    """
+
+    __slots__ = ('round', 'wallet', 'bet', 'stand_threshold', 'shuffles', 'dealt', 'checkpoint')
+
+    def __init__(self, round, wallet, bet, stand_threshold, shuffles, dealt, checkpoint=None):
+        self.round = round
+        self.wallet = wallet
+        self.bet = bet
+        self.stand_threshold = stand_threshold
+        self.shuffles = shuffles
+        self.dealt = dealt
+        self.checkpoint = checkpoint
+
+
 class Blackjack:
     """
     Game of blackjack!
@@ -12,7 +84,8 @@ class Blackjack:
     # Removes the game summaries from the previous doctest run
     >>> from os import remove, listdir
     >>> for f in listdir("game_summaries"):
-    ...    remove("game_summaries/" + f)
+    ...    if f.endswith(".txt"):
+    ...        remove("game_summaries/" + f)
 
     #######################################
     ### Doctests for calculate_score() ####
@@ -200,6 +273,13 @@ Card('A', 'spades'), Card('A', 'clubs'))
     >>> blackjack_4.play_round(1, 17)
     >>> print(blackjack_4.get_log())
     Not enough cards for a game.
+
+    # A shoe is reshuffled at the cut card, so play continues
+    >>> from deck import Shoe
+    >>> blackjack_shoe = Blackjack(500, deck=Shoe(num_decks=2), write_summary=False)
+    >>> blackjack_shoe.play_round(100, 17)
+    >>> blackjack_shoe.num_games
+    100
     
     # >>> blackjack_5 = Blackjack(50)
     # >>> blackjack_5.play_round(10, 18)
@@ -211,17 +291,115 @@ Card('A', 'spades'), Card('A', 'clubs'))
     """
     # Class Attribute(s)
     num_class_instances = 0
+    LOG_LEVELS = ('full', 'outcomes', 'none')
+    # Rounds between the deck checkpoints of a replay record, which bound
+    # how many rounds `replay_round` has to repeat.
+    REPLAY_INTERVAL = 32
     
-    def __init__(self, wallet):
+    def __init__(self, wallet, rng=None, summary_flush_size=SummaryWriter.default_flush_size,
+                 structured_log=False, verbosity='full', write_summary=True, deck=None,
+                 instrument=False, running_stats=False, fisher_yates=False, seed=None,
+                 record_replay=False, policy=None, bet_units=None):
         # Initializes instance attributes
         # auto-increment as needed
+        # `rng` is an optional numpy.random.Generator for the shuffle counts;
+        # without it the module-level numpy random state is used.
+        # Game summaries are buffered and written in blocks of about
+        # `summary_flush_size` characters.
+        # With `structured_log` rounds are recorded in a RoundLog instead of
+        # being formatted into `self.log`.
+        # `verbosity` is one of LOG_LEVELS: 'full' logs every card, 'outcomes'
+        # only the winner of each round and why play stopped, and 'none'
+        # skips logging entirely. `write_summary` turns the game summary
+        # files on or off.
+        # `deck` is the Deck or Shoe to play from; a fresh Deck by default.
+        # With `fisher_yates` every shuffle is a uniform Fisher-Yates shuffle
+        # driven by the deck's generator (`rng` unless the deck has its own,
+        # otherwise seeded from the module-level numpy random state) instead
+        # of the mongean and modified overhand passes.
+        # `seed` seeds a new Generator for this game alone, in place of `rng`.
+        # With `record_replay` a ReplayRecord of every round is kept in
+        # `self.replay` (see `replay_round`).
+        # `policy` is a Policy the player follows instead of hitting up to
+        # the stand threshold.
+        # `bet_units` replaces the win/loss bet progression with count-based
+        # betting: before each round the bet is 5 times
+        # bet_units[count], with the deck counter's betting count rounded
+        # down and clipped to the table. The deck must count its cards.
+        # With `instrument` play_round times each phase of a round and counts
+        # shuffle and deal calls (see `get_stats`).
+        # With `running_stats` every round is fed to a RunningStats in
+        # `self.running`.
         assert isinstance(wallet, (int, float))
+        assert deck is None or isinstance(deck, Deck)
+        assert verbosity in Blackjack.LOG_LEVELS
+        assert isinstance(write_summary, bool)
+        assert isinstance(instrument, bool)
+        assert isinstance(running_stats, bool)
+        assert isinstance(fisher_yates, bool)
+        assert seed is None or rng is None
+        assert isinstance(record_replay, bool)
+        assert policy is None or isinstance(policy, Policy)
+        assert bet_units is None or (len(bet_units) > 0 and deck is not None and deck.counter is not None)
+        if seed is not None:
+            rng = default_rng(seed)
         self.num_games = 0
-        self.Deck = Deck()
+        self.seed = seed
+        self.rng = rng
+        self.Deck = deck if deck is not None else Deck(rng)
+        if self.Deck.rng is None:
+            self.Deck.rng = rng
+        self.fisher_yates = fisher_yates
         self.wallet = wallet
         self.log = ""
         Blackjack.num_class_instances += 1
         self.bet = 0
+        self.summary = SummaryWriter(summary_flush_size)
+        self.in_context = False
+        self.verbosity = verbosity
+        self.write_summary = write_summary
+        self.records = None
+        if structured_log and verbosity != 'none':
+            self.records = RoundLog(type(wallet))
+        # Which parts of the text log to build, decided once so that rounds
+        # at lower verbosity skip the string formatting altogether.
+        self.log_details = self.records is None and verbosity == 'full'
+        self.log_outcomes = self.records is None and verbosity != 'none'
+        self.stats = GameStats() if instrument else None
+        if self.stats is not None:
+            self.Deck.calls = self.stats.calls
+        self.running = RunningStats(wallet) if running_stats else None
+        self.replay = [] if record_replay else None
+        self.policy = policy
+        self.bet_units = tuple(bet_units) if bet_units is not None else None
+        # Shuffles made since the last recorded round, and the deck's
+        # checkpoint from before them if that round keeps one.
+        self.pending_shuffles = []
+        self.pending_checkpoint = None
+
+    def __enter__(self):
+        """
+        Keeps the game summary file open across `play_round` calls until
+        the `with` block ends.
+
+        >>> with Blackjack(10) as game:
+        ...     game.play_round(2, 15)
+        ...     game.play_round(1, 15)
+        >>> game.summary.file is None
+        True
+        """
+        self.in_context = True
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        """
+        Writes out any buffered game summaries and closes the summary file.
+        """
+        self.in_context = False
+        self.summary.close()
     
     def play_round(self, num_rounds, stand_threshold):
         """
@@ -233,44 +411,311 @@ Card('A', 'spades'), Card('A', 'clubs'))
             will stand (ie player stands if they have a score >= 
             this threshold)
         """
+        for result in self.iter_rounds(num_rounds, stand_threshold):
+            pass
+
+    def iter_rounds(self, num_rounds, stand_threshold):
+        """
+        Plays up to `num_rounds` rounds like `play_round`, yielding a
+        RoundResult after each one so results can be consumed while the
+        game runs. Stops early when the deck or the wallet runs low.
+
+        >>> from numpy.random import default_rng
+        >>> game = Blackjack(10, rng=default_rng(4), verbosity='none', write_summary=False)
+        >>> for result in game.iter_rounds(5, 16):
+        ...     print(result)
+        RoundResult(round=1, player_score=18, dealer_score=17, winner=1, wallet=15, bet=5)
+        RoundResult(round=2, player_score=17, dealer_score=18, winner=-1, wallet=5, bet=10)
+        RoundResult(round=3, player_score=17, dealer_score=22, winner=1, wallet=10, bet=5)
+        RoundResult(round=4, player_score=20, dealer_score=18, winner=1, wallet=20, bet=10)
+        RoundResult(round=5, player_score=20, dealer_score=21, winner=-1, wallet=5, bet=15)
+        >>> result.player_cards
+        ((10, clubs), (Q, clubs))
+        >>> sum(result.winner for result in game.iter_rounds(5, 16))
+        -1
+
+        >>> game = Blackjack(100, rng=default_rng(4), write_summary=False, fisher_yates=True)
+        >>> [result.winner for result in game.iter_rounds(6, 16)]
+        [1, -1, 1, -1, 0, -1]
+
+        >>> game = Blackjack(10, rng=default_rng(4), write_summary=False, running_stats=True)
+        >>> game.play_round(5, 16)
+        >>> game.running.wins, game.running.losses, game.running.mean, game.running.max_drawdown
+        (3, 2, -1.0, 15)
+
+        Nothing outside the game is changed while it waits between rounds,
+        so games can be iterated side by side and an instrumented game only
+        counts its own calls:
+
+        >>> first = Blackjack(100, rng=default_rng(1), write_summary=False, instrument=True)
+        >>> second = Blackjack(100, rng=default_rng(2), write_summary=False, instrument=True)
+        >>> for pair in zip(first.iter_rounds(3, 16), second.iter_rounds(3, 16)):
+        ...     Blackjack(100, rng=default_rng(3), write_summary=False).play_round(2, 16)
+        >>> first.get_stats()['calls']
+        {'Deck.shuffle': 3, 'Shuffle.permutation': 6, 'Shuffle.apply': 3, 'Deck.deal_hand': 15}
+        >>> alone = Blackjack(100, rng=default_rng(1), write_summary=False, instrument=True)
+        >>> alone.play_round(3, 16)
+        >>> alone.get_stats()['calls'] == first.get_stats()['calls']
+        True
+        """
         assert isinstance(num_rounds, int) and not isinstance(num_rounds, bool)
         assert isinstance(stand_threshold, int) and not isinstance(stand_threshold, bool)
         assert 0 <= stand_threshold <= 21
         self.bet = 5
-        for round in range(num_rounds):
-            self.num_games += 1
-            self.playerhand = PlayerHand()
-            self.dealerhand = DealerHand()
-            if self.bet < 5:
-                self.bet = 5
-            if len(self.Deck.get_cards()) < 4:
-                self.log += 'Not enough cards for a game.'
-                return
-            if self.wallet < self.bet:
-                self.log += f"Wallet amount ${self.wallet} is less than bet amount ${self.bet}."
-                return
-            self.log += f'Round {self.num_games} of Blackjack!\nwallet: {self.wallet}\nbet: {self.bet}\n'
-            mong = randint(6)
-            overhand = randint(6)
-            self.Deck.shuffle(modified_overhand=overhand, mongean=mong)
-            for d in range(2):
-                self.Deck.deal_hand(self.playerhand)
-                self.Deck.deal_hand(self.dealerhand)
-            
-            self.log += f"Player Cards: {repr(self.playerhand.get_cards()[0])} {repr(self.playerhand.get_cards()[1])}\n"
-            self.log += f"Dealer Cards: {repr(self.dealerhand.get_cards()[0])} {repr(self.dealerhand.get_cards()[1])}\n"            
-            
-            self.hit_or_stand(self.playerhand, stand_threshold)
-            self.dealerhand.reveal_hand()
-            self.log += f"Dealer Cards Revealed: {repr(self.dealerhand.get_cards()[0])} {repr(self.dealerhand.get_cards()[1])}\n"
-            self.hit_or_stand(self.dealerhand, 17)
-            
-            winner = self.determine_winner(Blackjack.calculate_score(self.playerhand), Blackjack.calculate_score(self.dealerhand))
-            
-            self.wallet += winner*self.bet
-            self.bet += winner*5
-            self.add_to_file(self.playerhand, self.dealerhand, winner)
+        stats = self.stats
+        try:
+            for round in range(num_rounds):
+                if stats is not None:
+                    stats.start()
+                self.num_games += 1
+                self.playerhand = PlayerHand()
+                self.dealerhand = DealerHand()
+                if self.bet < 5:
+                    self.bet = 5
+                if self.Deck.needs_reshuffle():
+                    self.shuffle_deck('reshuffle')
+                if self.bet_units is not None:
+                    self.bet = self.count_bet()
+                if self.Deck.remaining() < 4:
+                    if self.records is not None:
+                        self.records.append_no_cards()
+                    elif self.log_outcomes:
+                        self.log += 'Not enough cards for a game.'
+                    return
+                if self.wallet < self.bet:
+                    if self.records is not None:
+                        self.records.append_low_wallet(self.wallet, self.bet)
+                    elif self.log_outcomes:
+                        self.log += f"Wallet amount ${self.wallet} is less than bet amount ${self.bet}."
+                    return
+                if self.log_details:
+                    self.log += f'Round {self.num_games} of Blackjack!\nwallet: {self.wallet}\nbet: {self.bet}\n'
+                self.shuffle_deck('shuffle')
+                if stats is not None:
+                    stats.lap('shuffle')
+                first_card = self.Deck.position
+                for d in range(2):
+                    self.Deck.deal_hand(self.playerhand)
+                    self.Deck.deal_hand(self.dealerhand)
+        
+                if self.log_details:
+                    self.log += f"Player Cards: {repr(self.playerhand.get_cards()[0])} {repr(self.playerhand.get_cards()[1])}\n"
+                    self.log += f"Dealer Cards: {repr(self.dealerhand.get_cards()[0])} {repr(self.dealerhand.get_cards()[1])}\n"            
         
+                if stats is not None:
+                    stats.lap('deal')
+                if self.policy is None:
+                    self.hit_or_stand(self.playerhand, stand_threshold)
+                else:
+                    self.follow_policy(self.playerhand, self.dealerhand.get_cards()[0].get_value())
+                if stats is not None:
+                    stats.lap('player')
+                self.dealerhand.reveal_hand()
+                if self.log_details:
+                    self.log += f"Dealer Cards Revealed: {repr(self.dealerhand.get_cards()[0])} {repr(self.dealerhand.get_cards()[1])}\n"
+                self.hit_or_stand(self.dealerhand, 17)
+                if stats is not None:
+                    stats.lap('dealer')
+        
+                player_score = Blackjack.calculate_score(self.playerhand)
+                dealer_score = Blackjack.calculate_score(self.dealerhand)
+                if self.log_outcomes:
+                    winner = self.determine_winner(player_score, dealer_score)
+                else:
+                    winner = Blackjack.compare_scores(player_score, dealer_score)
+                    if self.records is not None:
+                        self.record_round(first_card, player_score, dealer_score, winner)
+        
+                self.wallet += winner*self.bet
+                if self.running is not None:
+                    self.running.update(winner, winner*self.bet, self.wallet)
+                self.bet += winner*5
+                if stats is not None:
+                    stats.lap('scoring')
+                if self.write_summary:
+                    self.add_to_file(self.playerhand, self.dealerhand, winner)
+                if stats is not None:
+                    stats.lap('summary')
+                    stats.rounds += 1
+                stake = self.bet - winner*5
+                if self.replay is not None:
+                    self.replay.append(ReplayRecord(self.num_games, self.wallet - winner*stake, stake,
+                                                    stand_threshold, self.pending_shuffles,
+                                                    self.Deck.position, self.pending_checkpoint))
+                    self.pending_shuffles = []
+                    self.pending_checkpoint = None
+                yield RoundResult(self.num_games, tuple(self.playerhand.get_cards()),
+                                  tuple(self.dealerhand.get_cards()), player_score,
+                                  dealer_score, winner, self.wallet, stake)
+        finally:
+            if stats is not None:
+                stats.start()
+            if self.in_context:
+                self.summary.flush()
+            else:
+                self.summary.close()
+            if stats is not None:
+                stats.lap('summary')
+
+    def get_stats(self):
+        """
+        Returns the number of rounds timed, the seconds spent in each phase
+        of those rounds and the number of shuffle and deal calls made, for
+        a game created with `instrument=True`.
+
+        >>> from numpy.random import default_rng
+        >>> game = Blackjack(100, rng=default_rng(1), write_summary=False, instrument=True)
+        >>> game.play_round(5, 16)
+        >>> stats = game.get_stats()
+        >>> stats['rounds'], stats['calls']['Shuffle.apply'], stats['calls']['Deck.deal_hand']
+        (5, 5, 26)
+        >>> list(stats['seconds'])
+        ['shuffle', 'deal', 'player', 'dealer', 'scoring', 'summary']
+        >>> Blackjack(100).get_stats()
+        Traceback (most recent call last):
+        ...
+        AssertionError
+        """
+        assert self.stats is not None
+        return self.stats.get_stats()
+
+    def profile_round(self, num_rounds, stand_threshold, sort='cumulative', limit=20):
+        """
+        Plays `num_rounds` rounds like `play_round` under cProfile and
+        returns the `limit` most expensive functions, sorted by `sort`.
+
+        >>> report = Blackjack(100, write_summary=False).profile_round(3, 16)
+        >>> 'play_round' in report
+        True
+        """
+        return profile(self.play_round, num_rounds, stand_threshold, sort=sort, limit=limit)
+
+    def count_bet(self):
+        """
+        Returns the bet that `bet_units` gives for the deck's current count.
+
+        >>> from deck import Shoe
+        >>> game = Blackjack(1000, seed=2, deck=Shoe(6, count_system='hi-lo'),
+        ...                  write_summary=False, verbosity='none', bet_units=(1, 1, 2, 4, 8))
+        >>> from collections import Counter
+        >>> sorted(Counter(result.bet for result in game.iter_rounds(400, 17)).items())
+        [(5, 317), (10, 26), (20, 27), (40, 30)]
+        >>> round(game.Deck.counter.true_count(), 3), game.count_bet()
+        (-5.865, 5)
+        >>> game.Deck.counter.composition == list(game.Deck.composition())
+        True
+        """
+        count = int(self.Deck.counter.betting_count() // 1)
+        return 5 * self.bet_units[min(max(count, 0), len(self.bet_units) - 1)]
+
+    def shuffle_deck(self, method):
+        """
+        Shuffles the deck with its `method` ('shuffle' or 'reshuffle')
+        using freshly drawn shuffle counts, noting the shuffle for the
+        replay record if one is kept.
+        """
+        counts = self.shuffle_counts()
+        if self.replay is not None:
+            if not self.pending_shuffles and len(self.replay) % Blackjack.REPLAY_INTERVAL == 0:
+                if self.fisher_yates:
+                    self.Deck.generator()
+                self.pending_checkpoint = self.Deck.checkpoint()
+            self.pending_shuffles.append((method, counts))
+        getattr(self.Deck, method)(**counts)
+
+    def replay_round(records, index, deck=None, policy=None):
+        """
+        Plays round `records[index]` of a game again and returns its
+        RoundResult, without playing the rounds before it. `deck` must be a
+        new deck of the kind the game started with (a Deck by default). It
+        is restored from the nearest checkpoint at or before the round, and
+        the recorded shuffles and deals since then bring it to the state the
+        round started from, so at most `REPLAY_INTERVAL` rounds are
+        repeated. A game played with a Policy must pass the same `policy`.
+
+        >>> game = Blackjack(100, seed=11, write_summary=False, record_replay=True)
+        >>> results = list(game.iter_rounds(6, 16))
+        >>> results[4]
+        RoundResult(round=5, player_score=18, dealer_score=21, winner=-1, wallet=85, bet=10)
+        >>> Blackjack.replay_round(game.replay, 4)
+        RoundResult(round=5, player_score=18, dealer_score=21, winner=-1, wallet=85, bet=10)
+
+        >>> from deck import Shoe
+        >>> game = Blackjack(100, seed=3, deck=Shoe(1, 0.5), write_summary=False,
+        ...                  fisher_yates=True, record_replay=True)
+        >>> results = list(game.iter_rounds(30, 17))
+        >>> all(repr(Blackjack.replay_round(game.replay, i, Shoe(1, 0.5))) == repr(results[i])
+        ...     for i in range(len(results)))
+        True
+
+        >>> game = Blackjack(10**6, seed=5, deck=Shoe(2, 0.75), write_summary=False,
+        ...                  verbosity='none', record_replay=True)
+        >>> results = list(game.iter_rounds(100, 16))
+        >>> [i for i, record in enumerate(game.replay) if record.checkpoint is not None]
+        [0, 32, 64, 96]
+        >>> all(repr(Blackjack.replay_round(game.replay, i, Shoe(2, 0.75))) == repr(results[i])
+        ...     for i in (0, 31, 32, 33, 70, 99))
+        True
+        """
+        deck = deck if deck is not None else Deck()
+        start = index
+        while start > 0 and records[start].checkpoint is None:
+            start -= 1
+        if records[start].checkpoint is not None:
+            deck.restore(records[start].checkpoint)
+        for record in records[start:index]:
+            Blackjack.apply_shuffles(deck, record.shuffles)
+            deck.position = record.dealt
+        record = records[index]
+        Blackjack.apply_shuffles(deck, record.shuffles)
+
+        player, dealer = PlayerHand(), DealerHand()
+        for d in range(2):
+            deck.deal_hand(player)
+            deck.deal_hand(dealer)
+        if policy is None:
+            policy = Policy.threshold(record.stand_threshold)
+        upcard = dealer.get_cards()[0].get_value()
+        while deck.remaining() > 0 and policy.decide(Blackjack.calculate_score(player),
+                                                     player.is_soft(), upcard):
+            deck.deal_hand(player)
+        dealer.reveal_hand()
+        while deck.remaining() > 0 and Blackjack.calculate_score(dealer) < 17:
+            deck.deal_hand(dealer)
+        player_score = Blackjack.calculate_score(player)
+        dealer_score = Blackjack.calculate_score(dealer)
+        winner = Blackjack.compare_scores(player_score, dealer_score)
+        return RoundResult(record.round, tuple(player.get_cards()), tuple(dealer.get_cards()),
+                           player_score, dealer_score, winner,
+                           record.wallet + winner*record.bet, record.bet)
+
+    def apply_shuffles(deck, shuffles):
+        """
+        Repeats the recorded `shuffles` of a ReplayRecord on `deck`.
+        """
+        for method, counts in shuffles:
+            getattr(deck, method)(**counts)
+
+    def shuffle_counts(self):
+        """
+        Returns the keyword arguments of `Deck.shuffle` for the next
+        shuffle: a Fisher-Yates pass, or randomly drawn numbers of mongean
+        and modified overhand shuffles.
+
+        >>> from numpy.random import default_rng
+        >>> Blackjack(10, rng=default_rng(2)).shuffle_counts()
+        {'modified_overhand': 1, 'mongean': 5}
+        >>> Blackjack(10, fisher_yates=True).shuffle_counts()
+        {'fisher_yates': 1}
+        """
+        if self.fisher_yates:
+            return {'fisher_yates': 1}
+        if self.rng is None:
+            mong, overhand = randint(6), randint(6)
+        else:
+            mong, overhand = int(self.rng.integers(6)), int(self.rng.integers(6))
+        return {'modified_overhand': overhand, 'mongean': mong}
+
     def calculate_score(hand):
         """
         Calculates the score of a given hand. 
@@ -286,33 +731,38 @@ Card('A', 'spades'), Card('A', 'clubs'))
             The best score as an integer value.
         """
         assert isinstance(hand, (DealerHand, PlayerHand))
-        score = 0
-        ranks = [card.get_rank() for card in hand.get_cards()]
-        score += sum([10 if rank == 'K' or rank == 'J' or rank == 'Q' \
-        else rank if rank != 'A' else 0 for rank in ranks])
-        Aces = ranks.count('A')
-        if Aces == 1:
-            if score + 11 <= 21:
-                score += 11
-            else:
-                score += 1
-        elif Aces == 2:
-            if score + 12 <= 21:
-                score += 12
-            else:
-                score += 2
-        elif Aces == 3:
-            if score + 13 <= 21:
-                score += 13
-            else:
-                score += 3
-        elif Aces == 4:
-            if score + 14 <= 21:
-                score += 14
-            else:
-                score += 4
+        score = hand.hard_total
+        if hand.is_soft():
+            score += 10
         return score
 
+    def expected_value(stand_threshold, composition=None):
+        """
+        Returns the exact expected return per unit bet of standing at
+        `stand_threshold`, using the dealer outcome tables instead of
+        playing rounds. `composition` is the number of cards of each value
+        1 (Ace) to 10 left in the shoe (see `Deck.composition`); without it
+        the deck is treated as infinite.
+
+        >>> [round(Blackjack.expected_value(t), 3) for t in (12, 15, 17, 18, 20)]
+        [-0.106, -0.039, -0.0, -0.006, -0.179]
+        >>> round(Blackjack.expected_value(16, Deck().composition()), 4)
+        -0.0178
+        """
+        if composition is None:
+            return DealerProbabilities.expected_value(stand_threshold)
+        return ThresholdSolver(composition).expected_value(stand_threshold)
+
+    def optimal_threshold(composition):
+        """
+        Returns the (stand threshold, expected value) pair with the highest
+        exact expected value for a shoe with the given composition.
+
+        >>> Blackjack.optimal_threshold(Deck().composition())[0]
+        17
+        """
+        return ThresholdSolver(composition).optimal_threshold()
+
     def determine_winner(self, player_score, dealer_score):
         """
         Determine whether the Blackjack round ended with a tie, dealer winning, 
@@ -322,15 +772,36 @@ Card('A', 'spades'), Card('A', 'clubs'))
         Returns:
             1 if the player won, 0 if it is a tie, and -1 if the dealer won
         """
+        winner = Blackjack.compare_scores(player_score, dealer_score)
+        if self.records is not None:
+            self.records.append_result(player_score, dealer_score, winner)
+        elif self.log_outcomes:
+            self.log += result_text(winner, player_score, dealer_score)
+        return winner
+
+    def compare_scores(player_score, dealer_score):
+        """
+        Returns 1 if the player won, 0 if it is a tie, and -1 if the dealer
+        won, without logging anything.
+        """
         if player_score == dealer_score or (dealer_score > 21 and player_score > 21):
-            self.log += 'Player and Dealer tie.\n'
             return 0
         elif (player_score > dealer_score or dealer_score > 21) and player_score <= 21:
-            self.log += f'Player won with a score of {player_score}. Dealer lost with a score of {dealer_score}.\n'
             return 1
-        elif dealer_score > player_score or player_score > 21:
-            self.log += f'Player lost with a score of {player_score}. Dealer won with a score of {dealer_score}.\n'
-            return -1
+        return -1
+
+    def record_round(self, first_card, player_score, dealer_score, winner):
+        """
+        Adds the round just played to the structured log. The round's cards
+        were dealt from the deck starting at `first_card`: two to each hand
+        in turn, then the player's hits, then the dealer's.
+        """
+        dealt = [card.code for card in self.Deck.cards[first_card:self.Deck.position]]
+        player_hits = len(self.playerhand.get_cards()) - 2
+        self.records.append_round(self.num_games, self.wallet, self.bet,
+                                  dealt[0:4:2] + dealt[4:4 + player_hits],
+                                  dealt[1:4:2] + dealt[4 + player_hits:],
+                                  player_score, dealer_score, winner)
 
     def hit_or_stand(self, hand, stand_threshold):
         """
@@ -344,40 +815,89 @@ Card('A', 'spades'), Card('A', 'clubs'))
             this threshold).
         """
         assert isinstance(hand, (PlayerHand, DealerHand))
-        if len(self.Deck.get_cards()) == 0:
-            return
-        if Blackjack.calculate_score(hand) >= stand_threshold:
-            return
-        
-        cards = hand.get_cards()[:]
-        
-        self.Deck.deal_hand(hand)
         if isinstance(hand, DealerHand):
             player = 'Dealer'
         else:
             player = 'Player'
-        
-        new_cards = hand.get_cards()[:]
-        for card in cards:
-            new_cards.remove(card)
-        assert len(new_cards) == 1
-        new_card = new_cards[0]
-        
-        self.log += f'{player} pulled a ({new_card.get_rank()}, {new_card.get_suit()})\n'
-        return self.hit_or_stand(hand, stand_threshold)
+        while self.Deck.remaining() > 0 and Blackjack.calculate_score(hand) < stand_threshold:
+            new_card = self.Deck.deal_hand(hand)
+            if self.log_details:
+                self.log += f'{player} pulled a {new_card!r}\n'
+
+    def follow_policy(self, hand, upcard):
+        """
+        Deals cards to the player's `hand` while `self.policy` says to hit
+        against the dealer's `upcard` value, logging like `hit_or_stand`.
+
+        >>> from numpy.random import default_rng
+        >>> by_threshold = Blackjack(100, rng=default_rng(8), write_summary=False)
+        >>> by_threshold.play_round(9, 15)
+        >>> by_policy = Blackjack(100, rng=default_rng(8), write_summary=False,
+        ...                       policy=Policy.threshold(15))
+        >>> by_policy.play_round(9, 15)
+        >>> by_policy.get_log() == by_threshold.get_log()
+        True
+        >>> basic = Blackjack(100, rng=default_rng(8), write_summary=False,
+        ...                   verbosity='none', policy=Policy.basic())
+        >>> [result.winner for result in basic.iter_rounds(9, 15)]
+        [-1, 1, 0, -1, -1, 1, -1, 0, -1]
+        """
+        hits = self.policy.hits
+        while self.Deck.remaining() > 0:
+            score = Blackjack.calculate_score(hand)
+            if not hits[min(score, BUST), 1 if hand.is_soft() else 0, upcard]:
+                break
+            new_card = self.Deck.deal_hand(hand)
+            if self.log_details:
+                self.log += f'Player pulled a {new_card!r}\n'
 
     def get_log(self):
+        """
+        Returns the text log. With a structured log it is rendered from the
+        round records.
+
+        >>> from numpy.random import seed
+        >>> seed(5)
+        >>> text_game = Blackjack(100)
+        >>> text_game.play_round(8, 16)
+        >>> seed(5)
+        >>> structured_game = Blackjack(100, structured_log=True)
+        >>> structured_game.play_round(8, 16)
+        >>> structured_game.log
+        ''
+        >>> structured_game.get_log() == text_game.get_log()
+        True
+        >>> len(structured_game.records)
+        8
+
+        >>> seed(5)
+        >>> quiet_game = Blackjack(100, verbosity='outcomes', write_summary=False)
+        >>> quiet_game.play_round(3, 16)
+        >>> print(quiet_game.get_log())
+        Player won with a score of 21. Dealer lost with a score of 23.
+        Player lost with a score of 17. Dealer won with a score of 19.
+        Player lost with a score of 18. Dealer won with a score of 19.
+        <BLANKLINE>
+        >>> silent_game = Blackjack(100, verbosity='none', structured_log=True)
+        >>> silent_game.play_round(3, 16)
+        >>> silent_game.get_log(), silent_game.records
+        ('', None)
+        """
+        if self.records is not None:
+            return self.records.render(self.verbosity == 'outcomes')
         return self.log
     
     def reset_log(self):
         self.log = ""
+        if self.records is not None:
+            self.records.clear()
         return
         
         
     def add_to_file(self, player_hand, dealer_hand, result):
         """
         Writes the summary and outcome of a round of Blackjack to the 
-        corresponding .txt file.
+        corresponding .txt file through the buffered summary writer.
         """
         if result == 1:
             winner = 'Player'
@@ -386,8 +906,7 @@ Card('A', 'spades'), Card('A', 'clubs'))
         elif result == 0:
             winner = 'Tied'
         fn = f"./game_summaries/game_summary{Blackjack.num_class_instances}.txt"
-        
-        with open(fn, 'a', encoding = "utf-8") as f:
-            f.write('ROUND ' + str(self.num_games) + ':\n' + 'Player Hand:\n' \
-            + str(player_hand) + '\n' +  'Dealer Hand:\n' + str(dealer_hand) \
-            + '\n' + 'Winner of ROUND ' + str(self.num_games) + ': ' + winner + '\n\n')
+
+        self.summary.write(fn, 'ROUND ' + str(self.num_games) + ':\n' + 'Player Hand:\n' \
+        + str(player_hand) + '\n' +  'Dealer Hand:\n' + str(dealer_hand) \
+        + '\n' + 'Winner of ROUND ' + str(self.num_games) + ': ' + winner + '\n\n')
@@ -1,3 +1,29 @@
+from sys import intern
+
+RANKS = list(range(2, 11)) + ['J', 'Q', 'K', 'A']
+SUITS = ['clubs', 'diamonds', 'hearts', 'spades']
+SYMBOLS = ['♣', '♦', '♥', '♠']
+RANK_VALUES = list(range(2, 11)) + [10, 10, 10, 1]
+DECK_SIZE = len(RANKS) * len(SUITS)
+
+# Lookup tables indexed by the code of a card within its deck.
+FACE_RANKS = [RANKS[face // len(SUITS)] for face in range(DECK_SIZE)]
+FACE_SUITS = [SUITS[face % len(SUITS)] for face in range(DECK_SIZE)]
+FACE_SYMBOLS = [SYMBOLS[face % len(SUITS)] for face in range(DECK_SIZE)]
+FACE_VALUES = [RANK_VALUES[face // len(SUITS)] for face in range(DECK_SIZE)]
+FACE_ACES = [rank == 'A' for rank in FACE_RANKS]
+
+# Prebuilt, interned `str` and `repr` of every face, indexed by
+# [visible][code within its deck]; hidden cards all share one string.
+HIDDEN_ART = intern('____\n|?  |\n| ? |\n|__?|')
+HIDDEN_REPR = intern('(?, ?)')
+FACE_ART = [intern(f'____\n|{rank}  |\n| {symbol} |\n|__{rank}|')
+            for rank, symbol in zip(FACE_RANKS, FACE_SYMBOLS)]
+FACE_REPRS = [intern(f'({rank}, {suit})') for rank, suit in zip(FACE_RANKS, FACE_SUITS)]
+CARD_ART = ([HIDDEN_ART] * DECK_SIZE, FACE_ART)
+CARD_REPRS = ([HIDDEN_REPR] * DECK_SIZE, FACE_REPRS)
+
+
 class Card:
     """
     Card class.
@@ -77,7 +103,12 @@ class Card:
     AssertionError
     """
 
-    # Class Attribute(s)
+    # A card is a view over one small integer `code`. For a single deck
+    # code = rank_index * 4 + suit_index, which is both the order `Deck()`
+    # builds the cards in and the order `<` compares them in. Shoes number
+    # their decks one after another, so every table lookup uses
+    # `code % DECK_SIZE`.
+    __slots__ = ('code', 'visible')
 
     def __init__(self, rank, suit, visible=True):
         """
@@ -86,53 +117,32 @@ class Card:
         assert rank in list(range(2, 11)) + ['A', 'J', 'Q', 'K']
         assert suit in ['spades', 'diamonds', 'hearts', 'clubs']
         assert isinstance(visible, bool)
-        self.rank = rank
-        self.suit = suit
+        self.code = RANKS.index(rank) * len(SUITS) + SUITS.index(suit)
         self.visible = visible
 
-    def __lt__(self, other_card):
-        if self.get_rank() == '?':
-            return 'cannot compare'
-        temp_rank_self = self.get_rank()
-        temp_rank_other_card = other_card.get_rank()
-        if self.get_rank() == other_card.get_rank():
-            suit_self = self.get_suit()
-            suit_other = other_card.get_suit()
-            if suit_self == 'diamonds':
-                suit_self = 2
-            elif suit_self == 'spades':
-                suit_self = 4
-            elif suit_self == 'clubs':
-                suit_self = 1
-            elif suit_self == 'hearts':
-                suit_self = 3
-            if suit_other == 'diamonds':
-                suit_other = 2
-            elif suit_other == 'spades':
-                suit_other = 4
-            elif suit_other == 'clubs':
-                suit_other = 1
-            elif suit_other == 'hearts':
-                suit_other = 3
-            return suit_self < suit_other
-        if temp_rank_self == 'A':
-            temp_rank_self = 14
-        elif temp_rank_self == 'K':
-            temp_rank_self = 13
-        elif temp_rank_self == 'Q':
-            temp_rank_self = 12
-        elif temp_rank_self == 'J':
-            temp_rank_self = 11
-        if temp_rank_other_card == 'A':
-            temp_rank_other_card = 14
-        elif temp_rank_other_card == 'K':
-            temp_rank_other_card = 13
-        elif temp_rank_other_card == 'Q':
-            temp_rank_other_card = 12
-        elif temp_rank_other_card == 'J':
-            temp_rank_other_card = 11
-        return temp_rank_self < temp_rank_other_card
+    def from_code(code, visible=True):
+        """
+        Creates a card from its integer code.
+
+        >>> Card.from_code(0), Card.from_code(51), Card.from_code(103)
+        ((2, clubs), (A, spades), (A, spades))
+        """
+        assert isinstance(code, int) and code >= 0
+        card = Card.__new__(Card)
+        card.code = code
+        card.visible = visible
+        return card
+
+    @property
+    def rank(self):
+        return FACE_RANKS[self.code % DECK_SIZE]
 
+    @property
+    def suit(self):
+        return FACE_SUITS[self.code % DECK_SIZE]
+
+    def __lt__(self, other_card):
+        return self.code % DECK_SIZE < other_card.code % DECK_SIZE
 
     def __str__(self):
         """
@@ -149,35 +159,29 @@ class Card:
         | ? |
         |__?|             
         """
-        if self.get_suit() == 'diamonds':
-            suit = '♦'
-        elif self.get_suit() == 'spades':
-            suit = '♠'
-        elif self.get_suit() == 'hearts':
-            suit = '♥'
-        elif self.get_suit() == 'clubs':
-            suit = '♣'
-        if self.visible:
-            return '\n'.join(['____', '|{}  |'.format(self.get_rank()), \
-            '| {} |'.format(suit), '|__{}|'.format(self.get_rank())]).strip('\n')
-        elif not self.visible:
-            return '\n'.join(['____', '|?  |', '| ? |', '|__?|']).strip('\n')
+        return CARD_ART[self.visible][self.code % DECK_SIZE]
 
     def __repr__(self):
         """
         Returns (<rank>, <suit>). If the card is hidden, question marks are
         put in place of the actual rank and suit.           
         """        
-        if self.visible:
-            return '(' + str(self.get_rank()) + ', ' + self.get_suit() + ')'
-        elif not self.visible:
-            return '(?, ?)'
+        return CARD_REPRS[self.visible][self.code % DECK_SIZE]
 
     def get_rank(self):
-        return self.rank
+        return FACE_RANKS[self.code % DECK_SIZE]
 
     def get_suit(self):
-        return self.suit
+        return FACE_SUITS[self.code % DECK_SIZE]
+
+    def get_value(self):
+        """
+        Returns the Blackjack value of the card, counting an Ace as 1.
+        """
+        return FACE_VALUES[self.code % DECK_SIZE]
+
+    def is_ace(self):
+        return FACE_ACES[self.code % DECK_SIZE]
 
     def set_visible(self, visible):
         assert isinstance(visible, bool)
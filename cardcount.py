@@ -0,0 +1,79 @@
+from card import DECK_SIZE, FACE_VALUES
+
+# Tag of each card value 1 (Ace) .. 10, indexed by value (index 0 unused).
+TAG_SYSTEMS = {
+    'hi-lo': (0, -1, 1, 1, 1, 1, 1, 0, 0, 0, -1),
+    'ko': (0, -1, 1, 1, 1, 1, 1, 1, 0, 0, -1),
+    'omega-ii': (0, 0, 1, 1, 2, 2, 2, 1, 0, -1, -2),
+}
+# Unbalanced systems are bet on the running count, started at 4 - 4 * decks
+# so that a full count of the shoe ends at 4; balanced ones on the true count.
+UNBALANCED = {'ko'}
+
+
+class CardCounter:
+    """
+    Running count, true count and remaining composition of a deck or shoe,
+    updated in O(1) per card seen.
+
+    Tags are looked up by the code of each card within its deck.
+
+    >>> from card import Card
+    >>> counter = CardCounter('hi-lo', num_decks=1)
+    >>> for card in (Card(2, 'clubs'), Card(5, 'hearts'), Card('K', 'spades'), Card(3, 'clubs')):
+    ...     counter.see(card)
+    >>> counter.running, counter.cards_left, round(counter.true_count(), 3)
+    (2, 48, 2.167)
+    >>> counter.composition
+    [4, 3, 3, 4, 3, 4, 4, 4, 4, 15]
+
+    >>> ko = CardCounter('ko', num_decks=6)
+    >>> ko.running, ko.betting_count()
+    (-20, -20)
+    >>> omega = CardCounter('omega-ii')
+    >>> omega.see(Card(5, 'spades'))
+    >>> omega.running
+    2
+    """
+
+    def __init__(self, system='hi-lo', num_decks=1):
+        assert system in TAG_SYSTEMS
+        assert isinstance(num_decks, int) and num_decks > 0
+        self.system = system
+        self.num_decks = num_decks
+        tags = TAG_SYSTEMS[system]
+        self.face_tags = [tags[value] for value in FACE_VALUES]
+        self.reset()
+
+    def reset(self):
+        """
+        Starts counting a full, freshly shuffled shoe.
+        """
+        # KO starts at 4 - 4 * decks so that a full count comes back to 4.
+        self.running = 4 - 4 * self.num_decks if self.system in UNBALANCED else 0
+        self.composition = [4 * self.num_decks] * 9 + [16 * self.num_decks]
+        self.cards_left = DECK_SIZE * self.num_decks
+
+    def see(self, card):
+        """
+        Counts `card` as dealt.
+        """
+        face = card.code % DECK_SIZE
+        self.running += self.face_tags[face]
+        self.composition[FACE_VALUES[face] - 1] -= 1
+        self.cards_left -= 1
+
+    def true_count(self):
+        """
+        Returns the running count per deck left to deal.
+        """
+        return self.running * DECK_SIZE / max(self.cards_left, 1)
+
+    def betting_count(self):
+        """
+        Returns the count the system bets on: the running count for
+        unbalanced systems and the true count otherwise.
+        """
+        if self.system in UNBALANCED:
+            return self.running
+        return self.true_count()
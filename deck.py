@@ -1,4 +1,7 @@
-from card import Card
+from numpy.random import default_rng, randint
+
+from card import Card, DECK_SIZE
+from cardcount import CardCounter
 from hand import PlayerHand, DealerHand
 from shuffle import Shuffle
 
@@ -16,14 +19,20 @@ class Deck:
 
     >>> hand = PlayerHand()
     >>> deck.deal_hand(hand)
+    (A, clubs)
     >>> deck.get_cards()[0]
     (Q, clubs)
+    >>> deck.remaining()
+    51
+    >>> deck.composition()
+    (3, 4, 4, 4, 4, 4, 4, 4, 4, 16)
 
     >>> deck = Deck()
     >>> deck.shuffle()
     >>> hand = PlayerHand()
     >>> deck.shuffle(modified_overhand=0, mongean=0)
     >>> deck.deal_hand(hand)
+    (2, clubs)
     >>> hand.get_cards()
     [(2, clubs)]
     >>> deck.get_cards()[0]
@@ -31,22 +40,49 @@ class Deck:
 
     >>> dealer_hand = DealerHand()
     >>> deck.deal_hand(dealer_hand)
+    (2, diamonds)
     >>> deck.deal_hand(dealer_hand)
+    (?, ?)
     >>> dealer_hand.get_cards()
     [(2, diamonds), (?, ?)]
+
+    >>> deck = Deck(rng=default_rng(7))
+    >>> deck.shuffle(fisher_yates=1)
+    >>> deck.get_cards()[:3]
+    [(4, hearts), (K, hearts), (8, hearts)]
+    >>> deck.composition() == Deck().composition()
+    True
+
+    >>> deck = Deck(count_system='hi-lo')
+    >>> deck.shuffle(modified_overhand=2, mongean=3)
+    >>> for i in range(5):
+    ...     card = deck.deal_hand(hand)
+    >>> deck.counter.running, deck.counter.composition == list(deck.composition())
+    (-2, True)
     """
 
     # Class Attribute(s)
+    num_decks = 1
 
-    def __init__(self):
+    def __init__(self, rng=None, count_system=None):
         """
-        Creates a Deck instance containing cards sorted in ascending order.
+        Creates a Deck instance containing cards sorted in ascending order,
+        `num_decks` decks of them one after another.
+        `rng` is the numpy.random.Generator used for Fisher-Yates shuffles;
+        without it one is made on the first such shuffle (see `generator`).
+        With `count_system` (one of `cardcount.TAG_SYSTEMS`) the dealt
+        cards are counted by a CardCounter in `self.counter`.
         """
-
-        suits = ["clubs", "diamonds", "hearts", "spades"]
-        ranks = list(range(2, 11)) + ["J", "Q", "K", "A"]
-
-        self.cards = [(Card(r,s)) for r in ranks for s in suits]
+        self.cards = [Card.from_code(code) for code in range(DECK_SIZE * self.num_decks)]
+        # Cards before `position` have been dealt.
+        self.position = 0
+        self.rng = rng
+        self.counter = None
+        if count_system is not None:
+            self.counter = CardCounter(count_system, self.num_decks)
+        # Call counts of an instrumented game (see `profiling.GameStats`);
+        # None when calls are not counted.
+        self.calls = None
         
 
 
@@ -57,29 +93,194 @@ class Deck:
         Parameters:
             shuffle_and_count: keyword arguments containing the
             shuffle type and the number of times the shuffled
-            should be called.
+            should be called. `fisher_yates` shuffles uniformly at random
+            with the deck's generator after the deterministic shuffles;
+            repeating it adds nothing, so any count above 0 means one pass.
         """
-        assert all(map(lambda shuf_type: True if shuf_type in ['mongean', 'modified_overhand'] else False, shuffle_and_count.keys()))
+        assert all(map(lambda shuf_type: True if shuf_type in ['mongean', 'modified_overhand', 'fisher_yates'] else False, shuffle_and_count.keys()))
         assert all(map(lambda num: True if isinstance(num, int) and num > -1 else False, shuffle_and_count.values()))
 
     
 
-        if 'modified_overhand' in shuffle_and_count:
-            self.cards = Shuffle.modified_overhand(self.get_cards(), shuffle_and_count['modified_overhand'])
-            #print(shuffle_and_count['modified_overhand'])
-        if 'mongean' in shuffle_and_count:
-            for i in range(shuffle_and_count['mongean']):
-                self.cards = Shuffle.mongean(self.get_cards())
+        if self.calls is not None:
+            self.count_calls('Deck.shuffle')
+        cards = self.get_cards()
+        overhand = Shuffle.permutation('modified_overhand', len(cards), shuffle_and_count.get('modified_overhand', 0), self.calls)
+        mongean = Shuffle.permutation('mongean', len(cards), shuffle_and_count.get('mongean', 0), self.calls)
+        order = overhand[mongean]
+        if shuffle_and_count.get('fisher_yates', 0) > 0:
+            Shuffle.fisher_yates(order, self.generator(), self.calls)
+        self.cards = Shuffle.apply(cards, order, self.calls)
+        self.position = 0
 
     def deal_hand(self, hand):
         """
-        Takes the first card from the deck and adds it to `hand`.
+        Takes the first card from the deck, adds it to `hand` and returns it.
         """
         assert isinstance(hand, PlayerHand)
-        first_card = self.cards[0]
+        first_card = self.cards[self.position]
+        self.position += 1
         hand.add_card(first_card)
-        self.cards.remove(first_card)
-        return 
+        if self.counter is not None:
+            self.counter.see(first_card)
+        if self.calls is not None:
+            self.count_calls('Deck.deal_hand')
+        return first_card
+
+    def generator(self):
+        """
+        Returns the Generator for Fisher-Yates shuffles. If the deck was
+        not given one, it is seeded from the module-level numpy random
+        state, so `numpy.random.seed` makes the shuffles reproducible.
+
+        >>> from numpy.random import seed
+        >>> seed(4)
+        >>> first = Deck()
+        >>> first.shuffle(fisher_yates=1)
+        >>> seed(4)
+        >>> second = Deck()
+        >>> second.shuffle(fisher_yates=1)
+        >>> repr(first.get_cards()) == repr(second.get_cards())
+        True
+        """
+        if self.rng is None:
+            self.rng = default_rng(randint(2**31))
+        return self.rng
+
+    def checkpoint(self):
+        """
+        Returns what `restore` needs to put a deck of the same kind back in
+        its current order: the cards, the position and the state of its
+        Fisher-Yates generator, if it has one.
+        """
+        state = self.rng.bit_generator.state if self.rng is not None else None
+        return (tuple(self.cards), self.position, state)
+
+    def restore(self, checkpoint):
+        """
+        Puts the deck back in the order saved by `checkpoint`.
+
+        >>> deck = Deck(rng=default_rng(5))
+        >>> saved = deck.checkpoint()
+        >>> deck.shuffle(fisher_yates=1)
+        >>> first = repr(deck.get_cards())
+        >>> other = Deck()
+        >>> other.restore(saved)
+        >>> other.shuffle(fisher_yates=1)
+        >>> repr(other.get_cards()) == first
+        True
+        """
+        cards, self.position, state = checkpoint[:3]
+        self.cards = list(cards)
+        if state is not None:
+            self.rng = default_rng(0)
+            self.rng.bit_generator.state = state
+
+    def count_calls(self, *names):
+        """
+        Adds a call of each of `names` to the call counts in `self.calls`.
+        """
+        for name in names:
+            self.calls[name] = self.calls.get(name, 0) + 1
 
     def get_cards(self):
-        return self.cards
+        """
+        Returns the cards that have not been dealt yet.
+        """
+        return self.cards[self.position:]
+
+    def composition(self):
+        """
+        Returns the number of undealt cards of each value 1 (Ace) to 10.
+        """
+        counts = [0] * 10
+        for card in self.get_cards():
+            counts[card.get_value() - 1] += 1
+        return tuple(counts)
+
+    def remaining(self):
+        """
+        Returns the number of cards that have not been dealt yet.
+        """
+        return len(self.cards) - self.position
+
+    def needs_reshuffle(self):
+        """
+        Returns True if the deck should be gathered and reshuffled before
+        the next round. A single deck is played until it runs out.
+        """
+        return False
+
+
+class Shoe(Deck):
+    """
+    Shoe of several decks with a cut card. Once the cut card is reached the
+    dealt cards go back into the shoe and it is reshuffled.
+
+    >>> shoe = Shoe(num_decks=2, penetration=0.5)
+    >>> shoe.remaining(), shoe.cut_card
+    (104, 52)
+    >>> shoe.get_cards()[:3]
+    [(2, clubs), (2, diamonds), (2, hearts)]
+    >>> shoe.get_cards()[52:54]
+    [(2, clubs), (2, diamonds)]
+
+    >>> hand = PlayerHand()
+    >>> for i in range(50):
+    ...     card = shoe.deal_hand(hand)
+    >>> shoe.shuffle(mongean=1)
+    >>> shoe.needs_reshuffle()
+    False
+    >>> shoe.deal_hand(hand), shoe.deal_hand(hand)
+    ((A, spades), (A, diamonds))
+    >>> shoe.needs_reshuffle(), shoe.remaining()
+    (True, 52)
+    >>> shoe.reshuffle(modified_overhand=3, mongean=2)
+    >>> shoe.needs_reshuffle(), shoe.remaining()
+    (False, 104)
+    """
+
+    def __init__(self, num_decks=6, penetration=0.75, rng=None, count_system=None):
+        """
+        Creates a shoe of `num_decks` decks, each in ascending order. The cut
+        card is placed so that `penetration` of the shoe is dealt before it
+        is reshuffled. `rng` and `count_system` are as in Deck; the count
+        starts over whenever the shoe is reshuffled.
+        """
+        assert isinstance(num_decks, int) and num_decks > 0
+        assert isinstance(penetration, (int, float)) and 0 < penetration <= 1
+        self.num_decks = num_decks
+        super().__init__(rng, count_system)
+        self.cut_card = round(len(self.cards) * penetration)
+        # Cards dealt before the last shuffle, waiting for the reshuffle.
+        self.discards = []
+
+    def shuffle(self, **shuffle_and_count):
+        """
+        Moves the dealt cards to the discards and shuffles the rest of the
+        shoe, like `Deck.shuffle`.
+        """
+        self.discards.extend(self.cards[:self.position])
+        super().shuffle(**shuffle_and_count)
+
+    def needs_reshuffle(self):
+        return len(self.discards) + self.position >= self.cut_card
+
+    def checkpoint(self):
+        return super().checkpoint() + (tuple(self.discards),)
+
+    def restore(self, checkpoint):
+        super().restore(checkpoint)
+        self.discards = list(checkpoint[3])
+
+    def reshuffle(self, **shuffle_and_count):
+        """
+        Puts the discards and the dealt cards back under the undealt cards
+        and shuffles the whole shoe with the given shuffles.
+        """
+        self.cards = self.get_cards() + self.discards + self.cards[:self.position]
+        self.position = 0
+        self.discards = []
+        if self.counter is not None:
+            self.counter.reset()
+        super().shuffle(**shuffle_and_count)
@@ -32,6 +32,8 @@ class PlayerHand():
     
     >>> p_hand
     (2, diamonds) (3, clubs) (A, spades)
+    >>> p_hand.hard_total, p_hand.aces, p_hand.is_soft()
+    (6, 1, True)
 
     >>> d_hand = DealerHand()
     >>> d_hand.add_card(card_4)
@@ -51,6 +53,8 @@ class PlayerHand():
     |__?|
     >>> d_hand
     (4, hearts) (?, ?) (?, ?)
+    >>> d_hand.hard_total, d_hand.is_soft()
+    (19, False)
     >>> d_hand.reveal_hand()
     >>> print(d_hand)
     ____
@@ -107,6 +111,9 @@ class PlayerHand():
 
     def __init__(self):
         self.cards = []
+        # Running total with every Ace counted as 1, and the number of Aces.
+        self.hard_total = 0
+        self.aces = 0
 
 
     def add_card(self, *cards):
@@ -117,8 +124,22 @@ class PlayerHand():
         for card in cards:
             assert isinstance(card, Card)
             self.cards.append(card)
+            self.add_to_total(card)
         self.sort_hand()
 
+    def add_to_total(self, card):
+        """
+        Updates the running total and Ace count with `card`.
+        """
+        self.hard_total += card.get_value()
+        self.aces += card.is_ace()
+
+    def is_soft(self):
+        """
+        Returns True if an Ace can be counted as 11 without going over 21.
+        """
+        return self.aces > 0 and self.hard_total + 10 <= 21
+
     def get_cards(self):
         return self.cards           
 
@@ -129,7 +150,7 @@ class PlayerHand():
         """
         if len(self.get_cards()) == 0:
             return '[]'
-        return "\n".join(list((map(str, self.get_cards()))))
+        return "\n".join([str(card) for card in self.cards])
     
     def __repr__(self):
         """
@@ -138,7 +159,7 @@ class PlayerHand():
         """
         if len(self.get_cards()) == 0:
             return '[]'
-        return " ".join(list((map(repr, self.cards))))
+        return " ".join([repr(card) for card in self.cards])
 
     def sort_hand(self):
         """
@@ -175,6 +196,7 @@ class DealerHand(PlayerHand):
                 else:
                     card.set_visible(True)
                     self.cards.append(card)
+                self.add_to_total(card)
 
 
     def reveal_hand(self):
@@ -0,0 +1,124 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from numpy.random import SeedSequence, default_rng
+
+from blackjack import Blackjack
+from runningstats import RunningStats
+
+
+class MonteCarloResult:
+    """
+    Aggregate outcome of many Blackjack sessions.
+
+    Attributes:
+        wins, losses, ties: Total number of rounds with each outcome.
+        rounds: Total number of rounds played.
+        wallets: Final wallet of every session, in session order.
+        stats: RunningStats of every session merged in session order.
+    """
+
+    def __init__(self, stats, wallets):
+        self.stats = stats
+        self.wins = stats.wins
+        self.losses = stats.losses
+        self.ties = stats.ties
+        self.rounds = stats.rounds
+        self.wallets = np.asarray(wallets)
+
+    def __repr__(self):
+        return f'MonteCarloResult(wins={self.wins}, losses={self.losses}, ties={self.ties})'
+
+    def wallet_mean(self):
+        return float(self.wallets.mean())
+
+    def wallet_std(self):
+        return float(self.wallets.std())
+
+    def wallet_min(self):
+        return self.wallets.min().item()
+
+    def wallet_max(self):
+        return self.wallets.max().item()
+
+
+class ParallelRunner:
+    """
+    Runs Blackjack sessions across a process pool.
+
+    Every session gets its own `numpy.random.Generator` spawned from one
+    `SeedSequence`, so a session plays the same rounds whichever worker
+    runs it and the merged result does not depend on the number of workers.
+
+    >>> sessions = [(100, 20, threshold) for threshold in range(12, 20)]
+    >>> serial = ParallelRunner(workers=1).run(sessions, seed=7)
+    >>> pooled = ParallelRunner(workers=3).run(sessions, seed=7)
+    >>> serial
+    MonteCarloResult(wins=35, losses=29, ties=10)
+    >>> pooled
+    MonteCarloResult(wins=35, losses=29, ties=10)
+    >>> list(serial.wallets) == list(pooled.wallets)
+    True
+    >>> serial.wallet_mean() == pooled.wallet_mean()
+    True
+    >>> serial.stats.mean == pooled.stats.mean, serial.stats.sessions
+    (True, 8)
+    """
+
+    def __init__(self, workers=None):
+        assert workers is None or (isinstance(workers, int) and workers > 0)
+        self.workers = workers
+
+    def run(self, sessions, seed):
+        """
+        Plays every session and merges the results.
+
+        Parameters:
+            sessions: A list of (wallet, num_rounds, stand_threshold) tuples.
+            seed: Entropy for the root `SeedSequence`.
+        Returns:
+            A `MonteCarloResult`.
+        """
+        seeds = SeedSequence(seed).spawn(len(sessions))
+        jobs = list(zip(sessions, seeds))
+        if self.workers == 1:
+            chunk_results = [play_sessions(jobs)]
+        else:
+            workers = self.workers or os.cpu_count() or 1
+            size = max(1, -(-len(jobs) // workers))
+            with ProcessPoolExecutor(workers) as executor:
+                chunks = [jobs[i:i + size] for i in range(0, len(jobs), size)]
+                chunk_results = list(executor.map(play_sessions, chunks))
+        return ParallelRunner.merge(chunk_results)
+
+    def merge(chunk_results):
+        """
+        Combines per-worker lists of (RunningStats, wallet) pairs. Stats
+        are merged in session order, so the result does not depend on how
+        the sessions were split between workers.
+        """
+        stats = None
+        wallets = []
+        for chunk in chunk_results:
+            for session_stats, wallet in chunk:
+                stats = session_stats if stats is None else stats.merge(session_stats)
+                wallets.append(wallet)
+        if stats is None:
+            stats = RunningStats()
+            stats.sessions = 0
+        return MonteCarloResult(stats, wallets)
+
+
+def play_sessions(jobs):
+    """
+    Worker entry point: plays each (session, SeedSequence) job and returns
+    a (RunningStats, final wallet) pair per session.
+    """
+    results = []
+    for (wallet, num_rounds, stand_threshold), seed_seq in jobs:
+        game = Blackjack(wallet, rng=default_rng(seed_seq), verbosity='none',
+                         write_summary=False, running_stats=True)
+        game.play_round(num_rounds, stand_threshold)
+        results.append((game.running, game.wallet))
+    return results
@@ -0,0 +1,141 @@
+import csv
+import json
+
+import numpy as np
+
+from probability import BUST, NUM_TOTALS
+
+# Dealer upcards in the column order of strategy charts; an Ace is value 1.
+UPCARDS = [2, 3, 4, 5, 6, 7, 8, 9, 10, 1]
+
+# Hit/stand part of basic strategy against a dealer standing on all 17s,
+# as rows of actions ('H' hit, 'S' stand) against the UPCARDS. Without
+# doubling, soft hands below 18 always hit.
+BASIC_STRATEGY = {
+    'hard': {
+        12: 'HHSSSHHHHH',
+        13: 'SSSSSHHHHH',
+        14: 'SSSSSHHHHH',
+        15: 'SSSSSHHHHH',
+        16: 'SSSSSHHHHH',
+    },
+    'soft': {
+        17: 'HHHHHHHHHH',
+        18: 'SSSSSSSHHH',
+    },
+}
+
+
+class Policy:
+    """
+    Player strategy compiled into a dense table of hit decisions indexed
+    by [score, soft, dealer upcard value], so every decision is one array
+    index. Scores over 21 are looked up as BUST and always stand.
+
+    The same table works on scalars in `Blackjack` and on arrays in
+    `BatchBlackjack`.
+
+    >>> policy = Policy.threshold(17)
+    >>> policy.hits.shape
+    (23, 2, 11)
+    >>> bool(policy.hits[16, 0, 10]), bool(policy.hits[17, 1, 10])
+    (True, False)
+
+    >>> basic = Policy.basic()
+    >>> [bool(basic.hits[12, 0, upcard]) for upcard in UPCARDS]
+    [True, True, False, False, False, True, True, True, True, True]
+    >>> bool(basic.hits[18, 1, 9]), bool(basic.hits[18, 1, 8]), bool(basic.hits[17, 0, 1])
+    (True, False, False)
+    >>> bool(basic.hits[17, 1, 7]), bool(basic.hits[19, 1, 10])
+    (True, False)
+    >>> basic.decide(np.array([12, 16, 16]), np.array([0, 0, 1]), np.array([4, 10, 6]))
+    array([False,  True,  True])
+    """
+
+    def __init__(self, hits):
+        """
+        Wraps a (23, 2, 11) boolean table of hit decisions.
+        """
+        hits = np.asarray(hits, dtype=bool)
+        assert hits.shape == (NUM_TOTALS, 2, 11)
+        hits = hits.copy()
+        hits[BUST] = False
+        hits.setflags(write=False)
+        self.hits = hits
+
+    def decide(self, score, soft, upcard):
+        """
+        Returns whether to hit with `score` (soft if `soft`) against the
+        dealer's `upcard` value, for scalars or arrays alike.
+        """
+        return self.hits[np.minimum(score, BUST), np.asarray(soft, dtype=np.intp), upcard]
+
+    def threshold(stand_threshold):
+        """
+        Returns the policy of `hit_or_stand`: hit while the score is below
+        `stand_threshold`, whatever the hand or upcard.
+        """
+        assert isinstance(stand_threshold, int) and 0 <= stand_threshold <= 21
+        hits = np.zeros((NUM_TOTALS, 2, 11), dtype=bool)
+        hits[:stand_threshold] = True
+        return Policy(hits)
+
+    def from_chart(chart, default=17):
+        """
+        Compiles a chart of the form of BASIC_STRATEGY: for 'hard' and
+        'soft' hands, a dict mapping a score to a string of 'H' or 'S'
+        for each of the UPCARDS. Scores missing from the chart hit below
+        `default` and stand from it.
+        """
+        hits = Policy.threshold(default).hits.copy()
+        for soft, kind in enumerate(('hard', 'soft')):
+            for score, actions in chart.get(kind, {}).items():
+                score = int(score)
+                assert 0 <= score <= 21 and len(actions) == len(UPCARDS)
+                assert set(actions.upper()) <= {'H', 'S'}
+                for upcard, action in zip(UPCARDS, actions.upper()):
+                    hits[score, soft, upcard] = action == 'H'
+        return Policy(hits)
+
+    def basic():
+        """
+        Returns the hit/stand part of basic strategy.
+        """
+        return Policy.from_chart(BASIC_STRATEGY)
+
+    def load(path, default=17):
+        """
+        Reads a chart from a `.json` file laid out like BASIC_STRATEGY, or
+        from a `.csv` file with the header `total,soft,2,...,10,A` and one
+        row of H/S actions per hand.
+
+        >>> from os import remove
+        >>> with open('game_summaries/policy_test.csv', 'w') as f:
+        ...     _ = f.write('total,soft,2,3,4,5,6,7,8,9,10,A\\n12,0,H,H,S,S,S,H,H,H,H,H\\n')
+        >>> policy = Policy.load('game_summaries/policy_test.csv')
+        >>> bool(policy.hits[12, 0, 4]), bool(policy.hits[12, 0, 2]), bool(policy.hits[13, 0, 2])
+        (False, True, True)
+        >>> remove('game_summaries/policy_test.csv')
+        """
+        with open(path, newline='', encoding='utf-8') as f:
+            if path.endswith('.json'):
+                return Policy.from_chart(json.load(f), default)
+            assert path.endswith('.csv')
+            chart = {'hard': {}, 'soft': {}}
+            for row in csv.DictReader(f):
+                kind = 'soft' if int(row['soft']) else 'hard'
+                chart[kind][int(row['total'])] = ''.join(
+                    row[str(upcard) if upcard != 1 else 'A'].strip() for upcard in UPCARDS)
+            return Policy.from_chart(chart, default)
+
+    def save(self, path):
+        """
+        Writes the policy as a `.json` chart that `load` reads back.
+        """
+        chart = {}
+        for soft, kind in enumerate(('hard', 'soft')):
+            chart[kind] = {score: ''.join('H' if self.hits[score, soft, upcard] else 'S'
+                                          for upcard in UPCARDS)
+                           for score in range(22)}
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(chart, f, indent=2)
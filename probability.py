@@ -0,0 +1,280 @@
+from functools import lru_cache
+from math import lgamma
+
+import numpy as np
+
+from card import RANK_VALUES
+
+# Final totals are indexed 0..21, with every bust total folded into BUST.
+# `determine_winner` treats all busted scores alike, so BUST can be used
+# as a score directly.
+BUST = 22
+NUM_TOTALS = BUST + 1
+# Most `settle` results kept at once. One dealer hand from a given shoe
+# needs about 2,000 of them, so a few shoes' worth stay cached.
+SETTLE_CACHE_SIZE = 1 << 15
+# Number of cards of each value 1 (Ace) .. 10 in one deck.
+DECK_COMPOSITION = tuple(RANK_VALUES.count(value) * 4 for value in range(1, 11))
+INFINITE_PROBABILITIES = np.array(DECK_COMPOSITION) / sum(DECK_COMPOSITION)
+
+
+def build_payoffs():
+    """
+    Returns the 23 x 23 matrix of `determine_winner` results indexed by
+    [player total, dealer total].
+    """
+    payoffs = np.zeros((NUM_TOTALS, NUM_TOTALS))
+    for player_score in range(NUM_TOTALS):
+        for dealer_score in range(NUM_TOTALS):
+            if player_score == dealer_score or (dealer_score > 21 and player_score > 21):
+                payoffs[player_score, dealer_score] = 0
+            elif (player_score > dealer_score or dealer_score > 21) and player_score <= 21:
+                payoffs[player_score, dealer_score] = 1
+            else:
+                payoffs[player_score, dealer_score] = -1
+    return payoffs
+
+
+PAYOFFS = build_payoffs()
+
+
+class DealerProbabilities:
+    """
+    Exact distributions of final hand totals under the fixed
+    "hit until the score reaches a threshold" rule that `hit_or_stand`
+    applies, computed by memoized dynamic programming instead of sampling.
+
+    A composition is a tuple of the number of unseen cards of each value
+    1 (Ace) to 10; `None` stands for an infinite deck. Distributions are
+    arrays of length 23 indexed by final total, with index 22 for a bust.
+    A finite shoe can run out mid-hand, in which case the hand stands on
+    whatever it has, just like `hit_or_stand`.
+
+    >>> dist = DealerProbabilities.final_totals(6)
+    >>> print(round(dist[BUST], 4))
+    0.4232
+    >>> print(round(dist[17:].sum(), 10))
+    1.0
+
+    >>> table = DealerProbabilities.table()
+    >>> table.shape
+    (10, 23)
+    >>> [round(float(p), 4) for p in table[:, BUST]]
+    [0.1153, 0.3536, 0.3739, 0.3945, 0.4164, 0.4232, 0.2623, 0.2447, 0.2284, 0.2121]
+
+    # With only 10s left the dealer stands on 20 behind a 10 upcard
+    >>> float(DealerProbabilities.final_totals(10, (0, 0, 0, 0, 0, 0, 0, 0, 0, 3))[20])
+    1.0
+
+    # With a single 2 left the dealer stops on 8 when the shoe runs out
+    >>> dist = DealerProbabilities.final_totals(6, (0, 1, 0, 0, 0, 0, 0, 0, 0, 0))
+    >>> int(np.argmax(dist))
+    8
+    """
+
+    # Per upcard: every multiset of cards the dealer can draw before
+    # standing, as (counts by value, number of cards, number of orders the
+    # cards can be drawn in, final total).
+    hands = {}
+
+    def final_totals(upcard, composition=None):
+        """
+        Distribution of the dealer's final total given the value of the
+        upcard (1 for an Ace). `composition` holds the unseen cards, with
+        the upcard already removed; the hole card is drawn from it.
+        """
+        assert upcard in range(1, 11)
+        return DealerProbabilities.settle(upcard, upcard == 1, composition, 17, 1)
+
+    def final_totals_many(upcard, compositions):
+        """
+        Returns a (len(compositions), 23) array holding
+        `final_totals(upcard, composition)` for every composition, computed
+        in one vectorized pass. With `upcard` None the upcard is drawn from
+        each composition as well, giving the dealer's distribution before
+        any card is seen.
+
+        Any ordered draw of a multiset of cards has probability
+        prod(falling(count_v, m_v)) / falling(cards_left, m), so each
+        distribution is a weighted sum over the dealer's hand table.
+
+        >>> comps = [(4, 4, 4, 4, 3, 4, 4, 4, 4, 16), (1, 2, 0, 3, 1, 0, 2, 0, 4, 9)]
+        >>> many = DealerProbabilities.final_totals_many(6, comps)
+        >>> all(np.allclose(many[i], DealerProbabilities.final_totals(6, comp))
+        ...     for i, comp in enumerate(comps))
+        True
+        >>> blind = DealerProbabilities.final_totals_many(None, comps + [(1, 0, 0, 0, 0, 1, 0, 0, 0, 1)])
+        >>> all(np.allclose(blind[i], np.array(comp) @ DealerProbabilities.table(comp) / sum(comp))
+        ...     for i, comp in enumerate(comps + [(1, 0, 0, 0, 0, 1, 0, 0, 0, 1)]))
+        True
+        """
+        assert upcard is None or upcard in range(1, 11)
+        compositions = np.array(compositions, dtype=int).reshape(-1, 10)
+        counts, lengths, ways, finals = DealerProbabilities.hand_table(upcard)
+        cards_left = compositions.sum(axis=1)
+        dists = np.zeros((len(compositions), NUM_TOTALS))
+
+        # The table assumes the shoe never runs out mid-hand.
+        exact = cards_left >= lengths.max()
+        for i in np.flatnonzero(~exact):
+            composition = tuple(compositions[i].tolist())
+            if upcard is None:
+                dists[i] = compositions[i] @ DealerProbabilities.table(composition) / cards_left[i]
+            else:
+                dists[i] = DealerProbabilities.final_totals(upcard, composition)
+
+        rows = np.flatnonzero(exact)
+        if len(rows) == 0:
+            return dists
+        # Skip hands that need more cards of some value than any shoe has.
+        possible = (counts <= compositions[rows].max(axis=0)).all(axis=1)
+        counts, lengths = counts[possible], lengths[possible]
+        log_ways, finals = np.log(ways[possible]), finals[possible]
+        outcome = np.zeros((len(finals), NUM_TOTALS))
+        outcome[np.arange(len(finals)), finals] = 1.0
+        log_falling = DealerProbabilities.log_falling(max(cards_left.max(), 1), lengths.max())
+
+        # Sum the log factors with one matrix product: column (value, n) of
+        # `features` holds log(falling(count_value, n)) for each shoe, and
+        # `selects` picks the columns matching each hand's counts and size.
+        pairs = [(value, n) for value in range(10) for n in range(1, counts[:, value].max() + 1)]
+        sizes = np.unique(lengths)
+        selects = np.zeros((len(pairs) + len(sizes), len(finals)))
+        for column, (value, n) in enumerate(pairs):
+            selects[column] = counts[:, value] == n
+        for column, size in enumerate(sizes, len(pairs)):
+            selects[column] = lengths == size
+
+        chunk = max(1, 500000 // len(finals))
+        for start in range(0, len(rows), chunk):
+            block = rows[start:start + chunk]
+            features = np.empty((len(block), len(selects)))
+            for column, (value, n) in enumerate(pairs):
+                features[:, column] = log_falling[compositions[block, value], n]
+            for column, size in enumerate(sizes, len(pairs)):
+                features[:, column] = -log_falling[cards_left[block], size]
+            weights = features @ selects
+            weights += log_ways
+            dists[block] = np.exp(weights, out=weights) @ outcome
+        return dists
+
+    def hand_table(upcard):
+        """
+        Returns the dealer's hand table for `upcard`: arrays of card counts
+        by value, hand sizes, number of drawing orders and final totals.
+        The counts leave out the upcard, or include it when `upcard` is
+        None, in which case hands drawn under different upcards merge.
+        """
+        if upcard not in DealerProbabilities.hands:
+            first = upcard if upcard is not None else 0
+            finished = {}
+            frontier = {(0,) * 10: 1}
+            while frontier:
+                drawn = {}
+                for hand, ways in frontier.items():
+                    hard_total = first + sum((value + 1) * n for value, n in enumerate(hand))
+                    has_ace = upcard == 1 or hand[0] > 0
+                    score = hard_total
+                    if has_ace and hard_total + 10 <= 21:
+                        score += 10
+                    if sum(hand) + (upcard is not None) >= 2 and score >= 17:
+                        finished[hand] = (ways, min(score, BUST))
+                        continue
+                    for value in range(10):
+                        bigger = hand[:value] + (hand[value] + 1,) + hand[value + 1:]
+                        drawn[bigger] = drawn.get(bigger, 0) + ways
+                frontier = drawn
+            counts = np.array(list(finished), dtype=int)
+            ways = np.array([float(w) for w, _ in finished.values()])
+            finals = np.array([f for _, f in finished.values()], dtype=int)
+            DealerProbabilities.hands[upcard] = (counts, counts.sum(axis=1), ways, finals)
+        return DealerProbabilities.hands[upcard]
+
+    def log_falling(max_count, max_draws):
+        """
+        Returns a table of log(n * (n-1) * ... * (n-k+1)) indexed by
+        [n, k] for n <= `max_count` and k <= `max_draws`, with a very
+        negative number standing in for log(0) when k > n.
+        """
+        table = np.full((max_count + 1, max_draws + 1), -1e30)
+        for n in range(max_count + 1):
+            for k in range(min(n, max_draws) + 1):
+                table[n, k] = lgamma(n + 1) - lgamma(n - k + 1)
+        return table
+
+    def table(composition=None):
+        """
+        Returns a 10 x 23 array with the dealer's final total distribution
+        for every upcard value 1..10. For a finite `composition` the upcard
+        of each row is removed from it first; rows for values that are not
+        in the composition are all zero.
+        """
+        rows = np.zeros((10, NUM_TOTALS))
+        for value in range(1, 11):
+            if composition is None:
+                rows[value - 1] = DealerProbabilities.final_totals(value)
+            elif composition[value - 1] > 0:
+                remaining = DealerProbabilities.remove(composition, value)
+                rows[value - 1] = DealerProbabilities.final_totals(value, remaining)
+        return rows
+
+    @lru_cache(maxsize=SETTLE_CACHE_SIZE)
+    def settle(hard_total, has_ace, composition, stand_threshold, forced):
+        """
+        Distribution of the final total of a hand that must draw `forced`
+        more cards and then keeps hitting while its score is below
+        `stand_threshold`. Results are memoized in a bounded
+        least-recently-used cache, so long runs over many shoes do not
+        keep every composition they have seen.
+
+        Parameters:
+            hard_total (int): Current total with Aces counted as 1.
+            has_ace (bool): Whether the hand holds an Ace.
+            composition: Unseen cards by value, or None for an infinite deck.
+            stand_threshold (int): Score at which the hand stands.
+            forced (int): Number of cards to draw regardless of the score.
+        """
+        if composition is None:
+            probabilities = INFINITE_PROBABILITIES
+            cards_left = 1
+        else:
+            cards_left = sum(composition)
+            probabilities = np.array(composition) / max(cards_left, 1)
+
+        score = hard_total
+        if has_ace and hard_total + 10 <= 21:
+            score += 10
+        dist = np.zeros(NUM_TOTALS)
+        if cards_left == 0 or (forced == 0 and score >= stand_threshold):
+            dist[min(score, BUST)] = 1.0
+        else:
+            for value in range(1, 11):
+                if probabilities[value - 1] == 0:
+                    continue
+                remaining = composition
+                if composition is not None:
+                    remaining = DealerProbabilities.remove(composition, value)
+                dist += probabilities[value - 1] * DealerProbabilities.settle(
+                    hard_total + value, has_ace or value == 1, remaining,
+                    stand_threshold, max(forced - 1, 0))
+        dist.setflags(write=False)
+        return dist
+
+    def remove(composition, value):
+        """
+        Returns `composition` with one card of `value` taken out.
+        """
+        return composition[:value - 1] + (composition[value - 1] - 1,) + composition[value:]
+
+    def expected_value(stand_threshold):
+        """
+        Exact expected return per unit bet of standing at `stand_threshold`
+        against the dealer's stand-on-17 rule, for an infinite deck.
+
+        >>> print(round(DealerProbabilities.expected_value(16), 4))
+        -0.0188
+        """
+        assert isinstance(stand_threshold, int) and 0 <= stand_threshold <= 21
+        player = DealerProbabilities.settle(0, False, None, stand_threshold, 2)
+        dealer = INFINITE_PROBABILITIES @ DealerProbabilities.table()
+        return float(player @ PAYOFFS @ dealer)
@@ -0,0 +1,80 @@
+import cProfile
+import pstats
+from io import StringIO
+from time import perf_counter
+
+# Phases of a round timed by `Blackjack.play_round`, in the order they run.
+PHASES = ('shuffle', 'deal', 'player', 'dealer', 'scoring', 'summary')
+
+
+class GameStats:
+    """
+    Per-phase timers and call counters for an instrumented Blackjack game.
+
+    Each round calls `start` and then `lap` at the end of every phase, so
+    a phase is charged the time since the previous lap. Calls are counted
+    into `calls` by the game's own deck and by the `Shuffle` functions it
+    passes them to (see `Shuffle.count`), so games never count each
+    other's calls.
+
+    >>> stats = GameStats()
+    >>> stats.start()
+    >>> stats.lap('shuffle')
+    >>> stats.calls['Deck.deal_hand'] = 4
+    >>> stats.rounds += 1
+    >>> report = stats.get_stats()
+    >>> report['rounds'], report['calls']
+    (1, {'Deck.deal_hand': 4})
+    >>> list(report['seconds']) == list(PHASES)
+    True
+    >>> report['seconds']['shuffle'] > 0, report['seconds']['deal']
+    (True, 0.0)
+    """
+
+    def __init__(self):
+        self.seconds = dict.fromkeys(PHASES, 0.0)
+        self.calls = {}
+        self.rounds = 0
+        self.last = 0.0
+
+    def start(self):
+        self.last = perf_counter()
+
+    def lap(self, phase):
+        """
+        Charges the time since the last `start` or `lap` to `phase`.
+        """
+        now = perf_counter()
+        self.seconds[phase] += now - self.last
+        self.last = now
+
+    def get_stats(self):
+        """
+        Returns the number of rounds timed, the seconds spent in each phase
+        and the number of calls to each counted function.
+        """
+        return {'rounds': self.rounds, 'seconds': dict(self.seconds), 'calls': dict(self.calls)}
+
+    def reset(self):
+        """
+        Clears the timers and counters. `calls` stays the same dict, since
+        the game's deck counts into it.
+        """
+        self.seconds = dict.fromkeys(PHASES, 0.0)
+        self.calls.clear()
+        self.rounds = 0
+
+
+def profile(function, *args, sort='cumulative', limit=20):
+    """
+    Runs `function(*args)` under cProfile and returns the `limit` most
+    expensive entries, sorted by `sort`, as text.
+
+    >>> 'function calls' in profile(sorted, [3, 1, 2])
+    True
+    """
+    profiler = cProfile.Profile()
+    profiler.runcall(function, *args)
+    out = StringIO()
+    pstats.Stats(profiler, stream=out).sort_stats(sort).print_stats(limit)
+    return out.getvalue()
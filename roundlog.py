@@ -0,0 +1,211 @@
+import numpy as np
+
+from card import DECK_SIZE, FACE_REPRS
+
+# Kinds of log records.
+ROUND = 0        # A round that was played.
+NO_CARDS = 1     # play_round stopped because the deck ran low.
+LOW_WALLET = 2   # play_round stopped because the wallet was below the bet.
+RESULT = 3       # A determine_winner call outside of a round.
+
+# No hand can hold more than 21 cards: it stops hitting at a hard 21.
+MAX_CARDS = 21
+
+
+def record_dtype(wallet_type):
+    """
+    Returns the fixed-width record layout, storing wallets as `wallet_type`.
+    Card codes are listed in the order they were dealt, padded with -1.
+    """
+    return np.dtype([
+        ('kind', np.int8),
+        ('round', np.int64),
+        ('wallet', wallet_type),
+        ('bet', np.int64),
+        ('player_cards', np.int16, MAX_CARDS),
+        ('dealer_cards', np.int16, MAX_CARDS),
+        ('player_count', np.int8),
+        ('dealer_count', np.int8),
+        ('player_score', np.int16),
+        ('dealer_score', np.int16),
+        ('winner', np.int8),
+    ])
+
+
+def card_text(code):
+    """
+    Returns `repr` of the visible card with `code`.
+    """
+    return FACE_REPRS[code % DECK_SIZE]
+
+
+def result_text(winner, player_score, dealer_score):
+    """
+    Returns the log line `determine_winner` writes for a result.
+    """
+    if winner == 0:
+        return 'Player and Dealer tie.\n'
+    elif winner == 1:
+        return f'Player won with a score of {player_score}. Dealer lost with a score of {dealer_score}.\n'
+    return f'Player lost with a score of {player_score}. Dealer won with a score of {dealer_score}.\n'
+
+
+class RoundLog:
+    """
+    Structured Blackjack log holding one fixed-width record per round in a
+    preallocated NumPy array that doubles in size when it fills up.
+
+    The text log is rendered from the records only when it is asked for.
+
+    >>> from os import remove
+    >>> log = RoundLog(int, capacity=1)
+    >>> log.append_round(1, 10, 5, [32, 2, 31], [17, 37, 24], 21, 24, 1)
+    >>> log.append_result(20, 20, 0)
+    >>> log.append_low_wallet(0, 5)
+    >>> len(log), log.capacity
+    (3, 4)
+    >>> print(log.render())
+    Round 1 of Blackjack!
+    wallet: 10
+    bet: 5
+    Player Cards: (2, hearts) (10, clubs)
+    Dealer Cards: (6, diamonds) (?, ?)
+    Player pulled a (9, spades)
+    Dealer Cards Revealed: (6, diamonds) (J, diamonds)
+    Dealer pulled a (8, clubs)
+    Player won with a score of 21. Dealer lost with a score of 24.
+    Player and Dealer tie.
+    Wallet amount $0 is less than bet amount $5.
+
+    >>> log.save('game_summaries/round_log_test.npy')
+    >>> records = RoundLog.load('game_summaries/round_log_test.npy')
+    >>> records['winner'], records['player_cards'][0, :3]
+    (memmap([1, 0, 0], dtype=int8), memmap([32,  2, 31], dtype=int16))
+    >>> del records
+    >>> remove('game_summaries/round_log_test.npy')
+    """
+
+    def __init__(self, wallet_type, capacity=1024):
+        """
+        Creates an empty log. `wallet_type` is the type of the wallet (int
+        or float), so rendered amounts match the text log.
+        """
+        assert wallet_type in (int, float)
+        assert isinstance(capacity, int) and capacity > 0
+        self.dtype = record_dtype(np.int64 if wallet_type is int else np.float64)
+        self.records = np.zeros(capacity, dtype=self.dtype)
+        self.size = 0
+
+    def __len__(self):
+        return self.size
+
+    @property
+    def capacity(self):
+        return len(self.records)
+
+    def new_record(self, kind):
+        """
+        Returns the next free record, growing the array if it is full.
+        """
+        if self.size == len(self.records):
+            grown = np.zeros(2 * len(self.records), dtype=self.dtype)
+            grown[:self.size] = self.records
+            self.records = grown
+        record = self.records[self.size]
+        self.size += 1
+        record['kind'] = kind
+        return record
+
+    def append_round(self, round, wallet, bet, player_cards, dealer_cards,
+                     player_score, dealer_score, winner):
+        """
+        Records a played round. The card lists hold card codes in the
+        order they were dealt to each hand.
+        """
+        record = self.new_record(ROUND)
+        record['round'] = round
+        record['wallet'] = wallet
+        record['bet'] = bet
+        record['player_cards'] = -1
+        record['player_cards'][:len(player_cards)] = player_cards
+        record['dealer_cards'] = -1
+        record['dealer_cards'][:len(dealer_cards)] = dealer_cards
+        record['player_count'] = len(player_cards)
+        record['dealer_count'] = len(dealer_cards)
+        record['player_score'] = player_score
+        record['dealer_score'] = dealer_score
+        record['winner'] = winner
+
+    def append_result(self, player_score, dealer_score, winner):
+        record = self.new_record(RESULT)
+        record['player_score'] = player_score
+        record['dealer_score'] = dealer_score
+        record['winner'] = winner
+
+    def append_no_cards(self):
+        self.new_record(NO_CARDS)
+
+    def append_low_wallet(self, wallet, bet):
+        record = self.new_record(LOW_WALLET)
+        record['wallet'] = wallet
+        record['bet'] = bet
+
+    def get_records(self):
+        """
+        Returns a view of the records written so far.
+        """
+        return self.records[:self.size]
+
+    def clear(self):
+        self.size = 0
+
+    def save(self, path):
+        """
+        Writes the records to a `.npy` file.
+        """
+        np.save(path, self.get_records())
+
+    def load(path, mmap=True):
+        """
+        Reads records saved with `save`, memory-mapped unless `mmap` is
+        False.
+        """
+        return np.load(path, mmap_mode='r' if mmap else None)
+
+    def render(self, outcomes_only=False):
+        """
+        Returns the text `Blackjack.get_log()` would hold for these records.
+        With `outcomes_only` rounds are reduced to their result line.
+        """
+        lines = []
+        for record in self.get_records():
+            kind = record['kind']
+            if kind == ROUND and not outcomes_only:
+                lines.append(RoundLog.render_round(record))
+            elif kind == RESULT or kind == ROUND:
+                lines.append(result_text(record['winner'], record['player_score'], record['dealer_score']))
+            elif kind == NO_CARDS:
+                lines.append('Not enough cards for a game.')
+            elif kind == LOW_WALLET:
+                lines.append(f"Wallet amount ${record['wallet'].item()} is less than bet amount ${record['bet'].item()}.")
+        return ''.join(lines)
+
+    def render_round(record):
+        """
+        Returns the text log of one played round.
+        """
+        player = record['player_cards'][:record['player_count']].tolist()
+        dealer = record['dealer_cards'][:record['dealer_count']].tolist()
+        # Hands sort their cards, keeping cards of the same face in the
+        # order they were dealt.
+        player_start = sorted(player[:2], key=lambda code: code % DECK_SIZE)
+        dealer_start = sorted(dealer[:2], key=lambda code: code % DECK_SIZE)
+        text = f"Round {record['round']} of Blackjack!\nwallet: {record['wallet'].item()}\nbet: {record['bet'].item()}\n"
+        text += f"Player Cards: {card_text(player_start[0])} {card_text(player_start[1])}\n"
+        text += f"Dealer Cards: {card_text(dealer[0])} (?, ?)\n"
+        for code in player[2:]:
+            text += f'Player pulled a {card_text(code)}\n'
+        text += f"Dealer Cards Revealed: {card_text(dealer_start[0])} {card_text(dealer_start[1])}\n"
+        for code in dealer[2:]:
+            text += f'Dealer pulled a {card_text(code)}\n'
+        return text + result_text(record['winner'], record['player_score'], record['dealer_score'])
@@ -0,0 +1,148 @@
+import numpy as np
+
+
+class RunningStats:
+    """
+    Streaming statistics of a Blackjack session, updated once per round in
+    constant memory.
+
+    Tracks win, tie and loss counts, the mean and variance of the wallet
+    change per round (Welford's algorithm), a fixed-bin histogram of those
+    changes, the largest drop of the wallet from its peak and whether the
+    wallet fell below the minimum bet (ruin).
+
+    Stats of independent sessions can be combined with `merge`; merged
+    variances use Chan's pairwise update, so merging gives the same result
+    as one stream up to rounding.
+
+    >>> stats = RunningStats(wallet=15)
+    >>> wallet = 15
+    >>> for winner, bet in [(1, 5), (1, 10), (-1, 15), (0, 10), (-1, 10), (-1, 5)]:
+    ...     wallet += winner * bet
+    ...     stats.update(winner, winner * bet, wallet)
+    >>> stats.wins, stats.ties, stats.losses, stats.rounds
+    (2, 1, 3, 6)
+    >>> stats.win_rate()
+    0.3333333333333333
+    >>> stats.mean, round(stats.variance(), 4)
+    (-2.5, 87.5)
+    >>> stats.max_drawdown, stats.risk_of_ruin()
+    (30, 1.0)
+    >>> stats.quantile(0.5)
+    -5
+
+    >>> first, second = RunningStats(100), RunningStats(100)
+    >>> first.update(1, 5, 105)
+    >>> second.update(-1, -5, 95)
+    >>> second.update(-1, -10, 85)
+    >>> merged = first.merge(second)
+    >>> merged.sessions, merged.rounds, merged.max_drawdown, merged.risk_of_ruin()
+    (2, 3, 15, 0.0)
+    >>> round(merged.mean, 4), round(merged.variance(), 4)
+    (-3.3333, 58.3333)
+    """
+
+    def __init__(self, wallet=0, min_bet=5, low=-200, high=200, bin_width=5):
+        """
+        Creates the stats of a session starting with `wallet`. The session
+        is ruined once the wallet falls below `min_bet`. Wallet changes are
+        counted in bins of `bin_width` between `low` and `high`; changes
+        outside that range go in the first or last bin.
+        """
+        assert high > low and bin_width > 0 and (high - low) % bin_width == 0
+        self.wins = 0
+        self.ties = 0
+        self.losses = 0
+        self.rounds = 0
+        # Welford accumulators of the wallet change per round.
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.low = low
+        self.bin_width = bin_width
+        self.histogram = np.zeros((high - low) // bin_width, dtype=np.int64)
+        self.min_bet = min_bet
+        self.peak = wallet
+        self.max_drawdown = 0
+        self.sessions = 1
+        self.ruined = 0
+
+    def update(self, winner, change, wallet):
+        """
+        Adds a round with result `winner` (1, 0 or -1) that changed the
+        wallet by `change`, leaving it at `wallet`.
+        """
+        if winner == 1:
+            self.wins += 1
+        elif winner == -1:
+            self.losses += 1
+        else:
+            self.ties += 1
+        self.rounds += 1
+        delta = change - self.mean
+        self.mean += delta / self.rounds
+        self.m2 += delta * (change - self.mean)
+        index = (change - self.low) // self.bin_width
+        self.histogram[min(max(index, 0), len(self.histogram) - 1)] += 1
+        if wallet > self.peak:
+            self.peak = wallet
+        elif self.peak - wallet > self.max_drawdown:
+            self.max_drawdown = self.peak - wallet
+        if wallet < self.min_bet:
+            self.ruined = 1
+
+    def merge(self, other):
+        """
+        Adds the stats of the independent sessions in `other`, which must
+        use the same histogram bins, and returns self.
+        """
+        assert self.low == other.low and self.bin_width == other.bin_width
+        assert len(self.histogram) == len(other.histogram)
+        rounds = self.rounds + other.rounds
+        if rounds > 0:
+            delta = other.mean - self.mean
+            self.m2 += other.m2 + delta * delta * self.rounds * other.rounds / rounds
+            self.mean += delta * other.rounds / rounds
+        self.rounds = rounds
+        self.wins += other.wins
+        self.ties += other.ties
+        self.losses += other.losses
+        self.histogram += other.histogram
+        self.peak = max(self.peak, other.peak)
+        self.max_drawdown = max(self.max_drawdown, other.max_drawdown)
+        self.sessions += other.sessions
+        self.ruined += other.ruined
+        return self
+
+    def win_rate(self):
+        return self.wins / self.rounds if self.rounds else 0.0
+
+    def tie_rate(self):
+        return self.ties / self.rounds if self.rounds else 0.0
+
+    def loss_rate(self):
+        return self.losses / self.rounds if self.rounds else 0.0
+
+    def variance(self):
+        """
+        Returns the sample variance of the wallet change per round.
+        """
+        return self.m2 / (self.rounds - 1) if self.rounds > 1 else 0.0
+
+    def std(self):
+        return self.variance() ** 0.5
+
+    def risk_of_ruin(self):
+        """
+        Returns the fraction of sessions whose wallet fell below the
+        minimum bet.
+        """
+        return self.ruined / self.sessions
+
+    def quantile(self, q):
+        """
+        Returns the lower edge of the histogram bin holding the `q`
+        quantile of the wallet changes.
+        """
+        assert 0 <= q <= 1 and self.rounds > 0
+        index = int(np.searchsorted(np.cumsum(self.histogram), q * self.rounds))
+        return self.low + index * self.bin_width
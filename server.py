@@ -0,0 +1,337 @@
+"""
+Asyncio server hosting many Blackjack sessions over newline-delimited JSON.
+
+Each request is one JSON object per line with a `cmd` and an optional
+`id` that is echoed back; each response is one JSON object per line with
+`ok` set to true or false (with an `error`). Commands:
+
+    {"cmd": "new_session", "wallet": 100, "seed": 1, "verbosity": "outcomes"}
+                                                     -> {"session": ...}
+    {"cmd": "play_round", "session": ..., "rounds": 10, "threshold": 16}
+                                                     -> {"wallet": ..., "rounds": ...}
+    {"cmd": "get_log", "session": ..., "reset": true} -> {"log": ...}
+    {"cmd": "close_session", "session": ...}
+
+Sessions log at 'outcomes' verbosity unless a request asks for another
+of `Blackjack.LOG_LEVELS`. Each session keeps only the last `max_log`
+characters of its log; `get_log` with `reset` also clears it.
+
+Run it with `python server.py --port 8765` or `python server.py --unix PATH`.
+"""
+import argparse
+import asyncio
+import json
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from itertools import count
+
+from numpy.random import default_rng
+
+from blackjack import Blackjack
+
+
+class ServerError(Exception):
+    """
+    A request that cannot be served; reported to the client as an error.
+    """
+
+
+class Session:
+    """
+    A hosted game, the lock that serializes its commands and the time it
+    was last used.
+    """
+
+    def __init__(self, game):
+        self.game = game
+        self.lock = asyncio.Lock()
+        self.last_used = time.monotonic()
+
+    def busy(self):
+        return self.lock.locked()
+
+
+class SessionServer:
+    """
+    Hosts up to `max_sessions` Blackjack sessions for many clients at once.
+
+    Sessions are pooled in least-recently-used order. When the pool is full,
+    a new session replaces the least recently used idle one. Sessions idle
+    for `idle_timeout` seconds are evicted in the background. Rounds are
+    played in `executor` (a thread pool by default), so long simulations
+    never block the event loop. At most `max_pending` of them run or wait
+    there at once; further requests wait their turn. A request plays at most
+    `max_rounds` rounds, and a session's log is trimmed to its last
+    `max_log` characters (at a line break) after every request, so hosted
+    games hold bounded memory however long they run. Each connection is served one request at a time and
+    its responses are drained before the next line is read, so a slow client
+    holds back only itself.
+
+    Rounds are pure Python and hold the GIL, so the thread pool keeps the
+    event loop responsive but does not play rounds any faster than one
+    thread would: throughput does not grow with the number of threads. A
+    process pool would not help either, since every session is a mutable
+    game object that lives in this process.
+
+    >>> async def demo():
+    ...     server = SessionServer(max_sessions=2)
+    ...     await server.start(port=0)
+    ...     reader, writer = await asyncio.open_connection('127.0.0.1', server.port)
+    ...     async def call(**request):
+    ...         writer.write(json.dumps(request).encode() + b'\\n')
+    ...         await writer.drain()
+    ...         return json.loads(await reader.readline())
+    ...     session = (await call(cmd='new_session', wallet=100, seed=1, verbosity='outcomes'))['session']
+    ...     print(await call(id=7, cmd='play_round', session=session, rounds=3, threshold=16))
+    ...     print((await call(cmd='get_log', session=session, reset=True))['log'].count('\\n'))
+    ...     print(repr((await call(cmd='get_log', session=session))['log']))
+    ...     print(await call(cmd='play_round', session='nope', rounds=1, threshold=16))
+    ...     print(await call(cmd='play_round', session=session, rounds=1, threshold=30))
+    ...     print(await call(cmd='play_round', session=session, rounds=10**9, threshold=16))
+    ...     print(await call(cmd='new_session', wallet=10, seed='x'))
+    ...     for wallet in (10, 20):
+    ...         await call(cmd='new_session', wallet=wallet)
+    ...     print(len(server.sessions), session in server.sessions)
+    ...     writer.close()
+    ...     await writer.wait_closed()
+    ...     await server.close()
+    >>> asyncio.run(demo())
+    {'id': 7, 'ok': True, 'wallet': 90, 'rounds': 3}
+    3
+    ''
+    {'ok': False, 'error': 'unknown session nope'}
+    {'ok': False, 'error': 'invalid arguments'}
+    {'ok': False, 'error': 'at most 10000 rounds per request'}
+    {'ok': False, 'error': 'invalid arguments'}
+    2 False
+    """
+
+    def __init__(self, max_sessions=1000, idle_timeout=300.0, max_pending=32, executor=None,
+                 max_rounds=10000, max_log=100000):
+        assert isinstance(max_sessions, int) and max_sessions > 0
+        assert isinstance(max_rounds, int) and max_rounds > 0
+        assert isinstance(max_log, int) and max_log > 0
+        assert idle_timeout > 0
+        assert isinstance(max_pending, int) and max_pending > 0
+        self.max_sessions = max_sessions
+        self.idle_timeout = idle_timeout
+        self.max_rounds = max_rounds
+        self.max_log = max_log
+        self.sessions = OrderedDict()
+        self.session_ids = count(1)
+        self.executor = executor if executor is not None else ThreadPoolExecutor()
+        self.own_executor = executor is None
+        self.max_pending = max_pending
+        self.pending = None
+        self.server = None
+        self.evictor = None
+        self.port = None
+        # Writer of every open connection, and the task serving it.
+        self.connections = {}
+        self.commands = {
+            'new_session': self.new_session,
+            'play_round': self.play_round,
+            'get_log': self.get_log,
+            'close_session': self.close_session,
+        }
+
+    async def start(self, host='127.0.0.1', port=8765, path=None):
+        """
+        Starts listening on a Unix socket at `path`, or on `host`:`port`
+        (port 0 picks a free port, stored in `self.port`).
+        """
+        self.pending = asyncio.Semaphore(self.max_pending)
+        if path is not None:
+            self.server = await asyncio.start_unix_server(self.serve, path=path)
+        else:
+            self.server = await asyncio.start_server(self.serve, host, port)
+            self.port = self.server.sockets[0].getsockname()[1]
+        self.evictor = asyncio.get_running_loop().create_task(self.evict_forever())
+
+    async def close(self):
+        """
+        Stops accepting connections and background eviction, closes the
+        open connections and shuts down the executor if the server created
+        it.
+        """
+        self.evictor.cancel()
+        self.server.close()
+        for writer in self.connections:
+            writer.close()
+        await asyncio.gather(*self.connections.values(), return_exceptions=True)
+        await self.server.wait_closed()
+        if self.own_executor:
+            self.executor.shutdown(wait=False)
+
+    async def serve_forever(self):
+        await self.server.serve_forever()
+
+    async def serve(self, reader, writer):
+        """
+        Answers the requests of one connection, in order.
+        """
+        self.connections[writer] = asyncio.current_task()
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                response = await self.respond(line)
+                writer.write(json.dumps(response).encode() + b'\n')
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            del self.connections[writer]
+            writer.close()
+
+    async def respond(self, line):
+        """
+        Returns the response to one request line.
+        """
+        response = {}
+        try:
+            request = json.loads(line)
+            if not isinstance(request, dict):
+                raise ServerError('request must be a JSON object')
+            if 'id' in request:
+                response['id'] = request['id']
+            handler = self.commands.get(request.get('cmd'))
+            if handler is None:
+                raise ServerError(f"unknown command {request.get('cmd')}")
+            result = await handler(request)
+            response['ok'] = True
+            response.update(result)
+        except ServerError as error:
+            response.update(ok=False, error=str(error))
+        except json.JSONDecodeError:
+            response.update(ok=False, error='malformed JSON')
+        except (AssertionError, KeyError, TypeError, ValueError):
+            response.update(ok=False, error='invalid arguments')
+        return response
+
+    def session(self, request):
+        """
+        Returns the session a request names, marking it as recently used.
+        """
+        session_id = request['session']
+        session = self.sessions.get(session_id)
+        if session is None:
+            raise ServerError(f'unknown session {session_id}')
+        self.sessions.move_to_end(session_id)
+        session.last_used = time.monotonic()
+        return session
+
+    async def new_session(self, request):
+        # Unseeded sessions still get a generator of their own, so no two
+        # sessions share the module-level random state across threads.
+        seed, verbosity = request.get('seed'), request.get('verbosity', 'outcomes')
+        assert seed is None or (isinstance(seed, int) and not isinstance(seed, bool)
+                                and 0 <= seed < 2**64)
+        assert verbosity in Blackjack.LOG_LEVELS
+        game = Blackjack(request['wallet'], rng=default_rng() if seed is None else None, seed=seed,
+                         verbosity=verbosity, write_summary=False)
+        if len(self.sessions) >= self.max_sessions:
+            idle = next((key for key, session in self.sessions.items() if not session.busy()), None)
+            if idle is None:
+                raise ServerError('too many sessions')
+            del self.sessions[idle]
+        session_id = str(next(self.session_ids))
+        self.sessions[session_id] = Session(game)
+        return {'session': session_id}
+
+    async def play_round(self, request):
+        session = self.session(request)
+        rounds, threshold = request['rounds'], request['threshold']
+        assert isinstance(rounds, int) and isinstance(threshold, int) and 0 <= threshold <= 21
+        if rounds > self.max_rounds:
+            raise ServerError(f'at most {self.max_rounds} rounds per request')
+        async with session.lock, self.pending:
+            before = session.game.num_games
+            await asyncio.get_running_loop().run_in_executor(
+                self.executor, session.game.play_round, rounds, threshold)
+            self.trim_log(session.game)
+        session.last_used = time.monotonic()
+        return {'wallet': session.game.wallet, 'rounds': session.game.num_games - before}
+
+    async def get_log(self, request):
+        session = self.session(request)
+        reset = request.get('reset', False)
+        assert isinstance(reset, bool)
+        async with session.lock:
+            log = session.game.get_log()
+            if reset:
+                session.game.reset_log()
+            return {'log': log}
+
+    def trim_log(self, game):
+        """
+        Drops the oldest lines of `game`'s text log until it holds at most
+        `max_log` characters.
+
+        >>> server = SessionServer(max_log=13)
+        >>> game = Blackjack(10, write_summary=False)
+        >>> game.log = 'first line\\nsecond\\nthird\\n'
+        >>> server.trim_log(game)
+        >>> game.log
+        'second\\nthird\\n'
+        """
+        if len(game.log) > self.max_log:
+            start = len(game.log) - self.max_log
+            cut = game.log.find('\n', start - 1) + 1
+            game.log = game.log[cut or start:]
+
+    async def close_session(self, request):
+        self.session(request)
+        del self.sessions[request['session']]
+        return {}
+
+    def evict_idle(self, now=None):
+        """
+        Drops the sessions that have been idle for `idle_timeout` seconds
+        and returns how many were dropped.
+
+        >>> server = SessionServer(idle_timeout=60)
+        >>> _ = asyncio.run(server.new_session({'wallet': 10}))
+        >>> server.evict_idle(), server.evict_idle(now=time.monotonic() + 61)
+        (0, 1)
+        """
+        now = time.monotonic() if now is None else now
+        stale = [key for key, session in self.sessions.items()
+                 if not session.busy() and now - session.last_used >= self.idle_timeout]
+        for key in stale:
+            del self.sessions[key]
+        return len(stale)
+
+    async def evict_forever(self):
+        while True:
+            await asyncio.sleep(self.idle_timeout / 2)
+            self.evict_idle()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().split('\n')[0])
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--unix', metavar='PATH', help='listen on a Unix socket instead of TCP')
+    parser.add_argument('--max-sessions', type=int, default=1000)
+    parser.add_argument('--idle-timeout', type=float, default=300.0,
+                        help='seconds before an idle session is evicted')
+    parser.add_argument('--max-rounds', type=int, default=10000,
+                        help='most rounds a single play_round request may play')
+    parser.add_argument('--max-log', type=int, default=100000,
+                        help='characters of log kept per session')
+    args = parser.parse_args(argv)
+
+    async def run():
+        server = SessionServer(args.max_sessions, args.idle_timeout, max_rounds=args.max_rounds,
+                               max_log=args.max_log)
+        await server.start(args.host, args.port, args.unix)
+        await server.serve_forever()
+
+    asyncio.run(run())
+
+
+if __name__ == '__main__':
+    main()
@@ -1,3 +1,8 @@
+from collections import deque
+
+import numpy as np
+
+
 class Shuffle:
     """
     Different kinds of shuffling techniques.
@@ -62,7 +67,21 @@ class Shuffle:
     """    
 
 
-    def modified_overhand(cards, num):
+    # Permutation cache keyed by (shuffle type, deck length, count). Each
+    # entry is an index array `perm` such that the shuffled deck is
+    # `[cards[i] for i in perm]`.
+    permutations = {}
+
+    def count(calls, name):
+        """
+        Adds a call of `Shuffle.<name>` to the call counts in `calls`, if
+        any. Every function taking `calls` counts itself this way.
+        """
+        if calls is not None:
+            key = 'Shuffle.' + name
+            calls[key] = calls.get(key, 0) + 1
+
+    def modified_overhand(cards, num, calls=None):
         """
         Takes `num` cards from the middle of the deck and puts them at the
         top. 
@@ -71,27 +90,136 @@ class Shuffle:
         top half of the deck.
         """
         assert isinstance(num, int) and isinstance(cards, list)
-        if num == 0:
-            return cards
-        start = len(cards)//2 - num//2
-        end = len(cards)//2 + num//2
-        if len(cards) % 2 != 0 and num % 2 != 0:
-            end += 1
-        elif len(cards) % 2 == 0 and num % 2 != 0:
-            start -= 1
-        alt_card = cards[start:end] + cards[:start] + cards[end:]
-        return Shuffle.modified_overhand(alt_card, num - 1)
+        Shuffle.count(calls, 'modified_overhand')
+        return Shuffle.apply(cards, Shuffle.permutation('modified_overhand', len(cards), num, calls),
+                             calls)
 
-
-    def mongean(cards):
+    def mongean(cards, calls=None):
         """
         Implements the mongean shuffle. 
 
+        >>> calls = {}
+        >>> Shuffle.mongean([1, 2, 3], calls)
+        [2, 1, 3]
+        >>> calls
+        {'Shuffle.mongean': 1, 'Shuffle.permutation': 1, 'Shuffle.apply': 1}
+        """
+        Shuffle.count(calls, 'mongean')
+        return Shuffle.apply(cards, Shuffle.permutation('mongean', len(cards), 1, calls), calls)
+
+    def fisher_yates(cards, rng, calls=None):
+        """
+        Shuffles `cards` uniformly at random with an in-place Fisher-Yates
+        pass driven by the numpy.random.Generator `rng`, and returns them.
+
+        >>> from numpy.random import default_rng
+        >>> import numpy as np
+        >>> codes = np.arange(8)
+        >>> Shuffle.fisher_yates(codes, default_rng(1)) is codes
+        True
+        >>> codes.tolist()
+        [5, 0, 1, 4, 2, 6, 3, 7]
+        """
+        Shuffle.count(calls, 'fisher_yates')
+        rng.shuffle(cards)
+        return cards
+
+    def fisher_yates_many(rng, count, length):
+        """
+        Returns a (count, length) array of independent uniformly random
+        permutations of range(length), generated in one call.
+
+        >>> from numpy.random import default_rng
+        >>> perms = Shuffle.fisher_yates_many(default_rng(1), 1000, 52)
+        >>> perms.shape, bool((np.sort(perms, axis=1) == np.arange(52)).all())
+        ((1000, 52), True)
+        """
+        return rng.permuted(np.tile(np.arange(length), (count, 1)), axis=1)
+
+    def permutation(shuffle_type, length, count, calls=None):
+        """
+        Returns the cached index array for shuffling a deck of `length`
+        cards with `shuffle_type` applied `count` times.
+
+        >>> Shuffle.permutation('mongean', 5, 1)
+        array([3, 1, 0, 2, 4])
+        >>> Shuffle.permutation('modified_overhand', 5, 0)
+        array([0, 1, 2, 3, 4])
+        >>> len(Shuffle.permutation('mongean', 416, 5))
+        416
+
+        # Large counts are composed by repeated squaring, with only the
+        # requested count cached
+        >>> cards = list(range(52))
+        >>> for i in range(5000):
+        ...     cards = Shuffle.mongean(cards)
+        >>> Shuffle.permutation('mongean', 52, 5000).tolist() == cards
+        True
+        >>> sorted(count for kind, length, count in Shuffle.permutations
+        ...        if kind == 'mongean' and length == 52)
+        [1, 5000]
+        """
+        assert shuffle_type in ['mongean', 'modified_overhand']
+        assert isinstance(count, int) and count > -1
+        Shuffle.count(calls, 'permutation')
+        key = (shuffle_type, length, count)
+        if key not in Shuffle.permutations:
+            if shuffle_type == 'modified_overhand':
+                perm = Shuffle._overhand_order(length, count)
+            else:
+                perm = Shuffle._mongean_power(length, count)
+            perm.setflags(write=False)
+            Shuffle.permutations[key] = perm
+        return Shuffle.permutations[key]
+
+    def apply(cards, perm, calls=None):
+        """
+        Gathers `cards` in the order given by the index array `perm`.
+        """
+        Shuffle.count(calls, 'apply')
+        if isinstance(cards, np.ndarray):
+            return cards[perm]
+        return [cards[i] for i in perm.tolist()]
+
+    def _overhand_order(length, num):
+        """
+        Index order produced by `modified_overhand`, one pass per count
+        from `num` down to 1.
+        """
+        order = list(range(length))
+        for k in range(num, 0, -1):
+            start = length//2 - k//2
+            end = length//2 + k//2
+            if length % 2 != 0 and k % 2 != 0:
+                end += 1
+            elif length % 2 == 0 and k % 2 != 0:
+                start -= 1
+            order = order[start:end] + order[:start] + order[end:]
+        return np.array(order, dtype=np.intp)
+
+    def _mongean_power(length, count):
+        """
+        Index order produced by `count` mongean shuffles, composed by
+        repeated squaring of the single-shuffle order.
+        """
+        perm = np.arange(length)
+        square = Shuffle._mongean_order(length)
+        while count > 0:
+            if count % 2 == 1:
+                perm = perm[square]
+            square = square[square]
+            count //= 2
+        return perm
+
+    def _mongean_order(length):
+        """
+        Index order produced by one mongean shuffle: each card goes on
+        top of the pile when its position is odd and under it when even.
         """
-        
-        if cards == []:
-            return []
-        if len(cards) % 2 != 0: 
-            return Shuffle.mongean(cards[:-1]) + [cards[-1]] 
-        else: 
-            return [cards[-1]] + Shuffle.mongean(cards[:-1])
+        order = deque()
+        for i in range(length):
+            if i % 2 == 0:
+                order.append(i)
+            else:
+                order.appendleft(i)
+        return np.array(order, dtype=np.intp)
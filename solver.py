@@ -0,0 +1,180 @@
+import numpy as np
+
+from probability import BUST, DECK_COMPOSITION, PAYOFFS, DealerProbabilities
+
+
+class ThresholdSolver:
+    """
+    Exact expected return of the threshold player policy of `play_round`
+    (hit until the score reaches `stand_threshold`) against the dealer's
+    stand-on-17 rule, for a finite shoe.
+
+    The shoe is given as a composition: the number of cards of each value
+    1 (Ace) to 10. Its order is assumed to be uniformly random. Expected
+    values are found by walking every card the player can draw, with
+    states memoized on the remaining composition, and finishing each
+    player hand with the dealer tables of `DealerProbabilities`. Like
+    `hit_or_stand`, a hand stands when the shoe runs out.
+
+    >>> solver = ThresholdSolver()
+    >>> print(round(solver.expected_value(16), 4))
+    -0.0178
+    >>> abs(solver.expected_value(17)) < 1e-12
+    True
+    >>> solver.optimal_threshold()[0]
+    17
+
+    # A shoe short on 10s favours drawing to a higher score
+    >>> small = ThresholdSolver((4, 4, 4, 4, 4, 4, 0, 0, 0, 2))
+    >>> threshold, value = small.optimal_threshold()
+    >>> threshold, round(value, 4)
+    (19, 0.1493)
+
+    # Small shoes run out mid-round
+    >>> tiny = ThresholdSolver((1, 2, 0, 1, 0, 1, 0, 0, 0, 1))
+    >>> [round(tiny.expected_value(t), 4) for t in (0, 10, 15, 17, 21)]
+    [-0.7333, -0.5333, -0.0333, 0.4, 0.6]
+
+    >>> ThresholdSolver((0, 0, 0, 0, 0, 0, 0, 0, 0, 3))
+    Traceback (most recent call last):
+    ...
+    AssertionError
+    """
+
+    def __init__(self, composition=DECK_COMPOSITION):
+        """
+        Creates a solver for a shoe holding `composition` cards, which must
+        be enough for a round (at least 4 cards).
+        """
+        composition = tuple(composition)
+        assert len(composition) == 10 and all(count >= 0 for count in composition)
+        assert sum(composition) >= 4
+        self.composition = composition
+        # Expected value of every stand threshold, once all are solved.
+        self.values = None
+
+    def expected_value(self, stand_threshold):
+        """
+        Returns the exact expected return per unit bet of standing at
+        `stand_threshold`.
+        """
+        assert isinstance(stand_threshold, int) and 0 <= stand_threshold <= 21
+        if self.values is not None:
+            return self.values[stand_threshold]
+        return self.solve(stand_threshold, stand_threshold)[stand_threshold]
+
+    def expected_values(self):
+        """
+        Returns the expected value of every stand threshold from 0 to 21.
+        """
+        if self.values is None:
+            self.values = self.solve(0, 21)
+        return self.values
+
+    def optimal_threshold(self):
+        """
+        Returns the (stand threshold, expected value) pair with the highest
+        expected value, preferring the lowest threshold on ties.
+        """
+        values = self.expected_values()
+        best = int(np.argmax(np.round(values, 12)))
+        return best, values[best]
+
+    def solve(self, lowest, highest):
+        """
+        Returns a list of 22 numbers holding the expected value of every
+        stand threshold from `lowest` to `highest` (the others are not
+        meaningful).
+
+        The thresholds share one walk of the player's draws: each finished
+        hand adds its value to the range of thresholds that stop there, and
+        the dealer is settled once for every composition the player can
+        leave, whatever the threshold.
+        """
+        outcomes = self.player_outcomes(lowest, highest)
+        keys = list(outcomes)
+        probabilities = np.fromiter(outcomes.values(), float, len(keys))
+        scores = np.array([key[0] for key in keys])
+        lows = np.array([key[1] for key in keys])
+        ends = np.array([key[2] for key in keys])
+        left, inverse = np.unique(np.array([key[3] for key in keys]), axis=0, return_inverse=True)
+
+        # The threshold policy ignores the dealer's upcard and the shoe is in
+        # random order, so the player's cards can be drawn first and all of
+        # the dealer's from what is left when the player stands.
+        dealer = DealerProbabilities.final_totals_many(None, left)
+
+        weights = probabilities * (PAYOFFS[scores] * dealer[inverse.ravel()]).sum(axis=1)
+        # Difference array over thresholds 0..21 (index 22 is past the end).
+        changes = np.zeros(BUST + 1)
+        np.add.at(changes, lows, weights)
+        np.subtract.at(changes, ends, weights)
+        return np.cumsum(changes)[:BUST].tolist()
+
+    def player_outcomes(self, lowest, highest):
+        """
+        Returns a dict mapping (final score, first threshold, end threshold,
+        unseen composition) to the probability that the player finishes
+        there, for every stand threshold from the first up to but not
+        including the end, starting from an empty hand. Only thresholds from
+        `lowest` to `highest` are followed. The dealer's two cards are still
+        among the unseen ones.
+
+        Player states are merged by the remaining composition, which
+        determines the cards in the hand, and by the highest score held
+        since the second card: a hand is only still drawing at thresholds
+        above it. A hand on `score` stops at thresholds up to `score`, and
+        at every threshold once only two cards are left; since the dealer's
+        cards were dealt before the player hits, the player cannot draw
+        them.
+        """
+        finished = {}
+        # The highest score is -1 until the hand holds two cards, since a
+        # hand always draws at least two.
+        frontier = {(self.composition, -1): (1.0, 0, False)}
+        drawn = 0
+        while frontier:
+            next_frontier = {}
+            for (remaining, held), (probability, hard_total, has_ace) in frontier.items():
+                score = hard_total
+                if has_ace and hard_total + 10 <= 21:
+                    score += 10
+                cards_left = sum(remaining)
+                if cards_left <= 2:
+                    end = highest + 1
+                elif drawn >= 2:
+                    end = min(score, highest) + 1
+                else:
+                    end = 0
+                first = max(held + 1, lowest)
+                if end > first:
+                    key = (min(score, BUST), first, end, remaining)
+                    finished[key] = finished.get(key, 0.0) + probability
+                if drawn >= 2:
+                    held = max(held, score)
+                if cards_left <= 2 or held >= highest:
+                    continue
+                for card, p_card, after in self.draws(remaining, cards_left):
+                    state = (after, held)
+                    reached = next_frontier.get(state)
+                    if reached is not None:
+                        next_frontier[state] = (reached[0] + probability * p_card,) + reached[1:]
+                    else:
+                        next_frontier[state] = (probability * p_card, hard_total + card,
+                                                has_ace or card == 1)
+            frontier = next_frontier
+            drawn += 1
+        return finished
+
+    def draws(self, composition, cards_left=None):
+        """
+        Yields (value, probability, remaining composition) for every card
+        value that can be drawn from `composition`, which holds
+        `cards_left` cards if given.
+        """
+        if cards_left is None:
+            cards_left = sum(composition)
+        for value, count in enumerate(composition, 1):
+            if count > 0:
+                yield value, count / cards_left, \
+                    composition[:value - 1] + (count - 1,) + composition[value:]
@@ -0,0 +1,77 @@
+class SummaryWriter:
+    """
+    Buffered writer for game summary files.
+
+    Rendered rounds are collected in memory and appended to the summary
+    file in blocks once about `flush_size` characters are buffered. The
+    file is opened on the first flush and kept open until `close()`;
+    writing to a different path flushes and closes the current file first.
+
+    >>> from os import remove
+    >>> writer = SummaryWriter(flush_size=10)
+    >>> writer.write('game_summaries/summary_test.txt', 'ROUND 1:\\n')
+    >>> writer.file is None
+    True
+    >>> writer.write('game_summaries/summary_test.txt', 'ROUND 2:\\n')
+    >>> writer.file is None
+    False
+    >>> writer.write('game_summaries/summary_test.txt', 'ROUND 3:\\n')
+    >>> writer.close()
+    >>> with open('game_summaries/summary_test.txt', encoding='utf-8') as f:
+    ...     print(f.read())
+    ROUND 1:
+    ROUND 2:
+    ROUND 3:
+    <BLANKLINE>
+    >>> remove('game_summaries/summary_test.txt')
+    """
+
+    default_flush_size = 1 << 16
+
+    def __init__(self, flush_size=default_flush_size):
+        assert isinstance(flush_size, int) and flush_size > 0
+        self.flush_size = flush_size
+        self.path = None
+        self.file = None
+        self.buffer = []
+        self.buffered = 0
+
+    def write(self, path, text):
+        """
+        Buffers `text` to be appended to the file at `path`.
+        """
+        if path != self.path:
+            self.close()
+            self.path = path
+        self.buffer.append(text)
+        self.buffered += len(text)
+        if self.buffered >= self.flush_size:
+            self.flush()
+
+    def flush(self):
+        """
+        Appends everything buffered so far to the summary file.
+        """
+        if not self.buffer:
+            return
+        if self.file is None:
+            self.file = open(self.path, 'a', encoding="utf-8")
+        self.file.write(''.join(self.buffer))
+        self.file.flush()
+        self.buffer = []
+        self.buffered = 0
+
+    def close(self):
+        """
+        Flushes the buffer and closes the summary file.
+        """
+        self.flush()
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
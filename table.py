@@ -0,0 +1,172 @@
+import numpy as np
+from numpy.random import default_rng, randint
+
+from batch import CARD_ACES, CARD_VALUES, BatchBlackjack, BatchResult
+from card import DECK_SIZE, FACE_ACES, FACE_VALUES
+from deck import Deck
+
+MAX_SEATS = 7
+
+
+class Table:
+    """
+    Blackjack table dealing several seats and the dealer from one shared
+    deck or shoe, so every seat's cards depend on what the others drew.
+
+    Each round follows `play_round`: the deck is shuffled, every seat and
+    then the dealer get one card, then a second card each in the same
+    order, the seats hit in turn to their own stand threshold, and the
+    dealer hits to 17. The opening deal, scoring and settling are NumPy
+    operations across all seats; only the hits are dealt one by one, as
+    they come off the shoe in seat order. A seat whose wallet is below its
+    bet sits out; play stops when every seat sits out or the deck holds too
+    few cards for the deal.
+
+    A table with one seat plays exactly like `Blackjack`:
+
+    >>> from blackjack import Blackjack
+    >>> game = Blackjack(100, rng=default_rng(5), verbosity='none', write_summary=False)
+    >>> winners = [result.winner for result in game.iter_rounds(9, 16)]
+    >>> result = Table([100], [16], rng=default_rng(5)).play_rounds(9)
+    >>> result.winner[0, result.played[0]].tolist() == winners
+    True
+    >>> int(result.wallet[0, -1]) == game.wallet
+    True
+
+    >>> from deck import Shoe
+    >>> table = Table([100, 50, 200], [12, 15, 17], deck=Shoe(6), rng=default_rng(1))
+    >>> result = table.play_rounds(200)
+    >>> result.rounds_played.tolist(), table.wallets.tolist()
+    ([40, 17, 124], [5, 0, 10])
+
+    A counting shoe sees every card the table deals:
+
+    >>> table = Table([100, 100], [15, 17], deck=Shoe(2, count_system='hi-lo'), rng=default_rng(2))
+    >>> result = table.play_rounds(25)
+    >>> table.Deck.counter.composition == list(table.Deck.composition())
+    True
+    """
+
+    def __init__(self, wallets, stand_thresholds, deck=None, rng=None, seed=None):
+        """
+        Creates a table with one seat per entry of `wallets`, each standing
+        at the matching entry of `stand_thresholds`. `deck` is the Deck or
+        Shoe to deal from (a fresh Deck by default). Shuffle counts are
+        drawn from the Generator `rng`, one seeded with `seed`, or the
+        module-level numpy random state, as in `Blackjack`.
+        """
+        assert 0 < len(wallets) <= MAX_SEATS and len(stand_thresholds) == len(wallets)
+        assert all(isinstance(wallet, (int, float)) for wallet in wallets)
+        assert all(isinstance(t, int) and 0 <= t <= 21 for t in stand_thresholds)
+        assert deck is None or isinstance(deck, Deck)
+        assert seed is None or rng is None
+        if seed is not None:
+            rng = default_rng(seed)
+        self.rng = rng
+        self.Deck = deck if deck is not None else Deck(rng)
+        self.wallets = np.array(wallets)
+        self.stand_thresholds = np.array(stand_thresholds)
+        self.bets = np.full(len(wallets), 5)
+        self.num_games = 0
+
+    def shuffle_counts(self):
+        """
+        Draws the numbers of mongean and modified overhand shuffles, like
+        `Blackjack.shuffle_counts`.
+        """
+        if self.rng is None:
+            mong, overhand = randint(6), randint(6)
+        else:
+            mong, overhand = int(self.rng.integers(6)), int(self.rng.integers(6))
+        return {'modified_overhand': overhand, 'mongean': mong}
+
+    def play_rounds(self, num_rounds):
+        """
+        Plays up to `num_rounds` rounds and returns a BatchResult with one
+        row per seat.
+        """
+        assert isinstance(num_rounds, int) and not isinstance(num_rounds, bool)
+        seats = len(self.wallets)
+        played = np.zeros((seats, num_rounds), dtype=bool)
+        winners = np.zeros((seats, num_rounds), dtype=np.int8)
+        player_scores = np.zeros((seats, num_rounds), dtype=int)
+        dealer_scores = np.zeros((seats, num_rounds), dtype=int)
+        bets = np.zeros((seats, num_rounds), dtype=int)
+        wallets = np.zeros((seats, num_rounds + 1), dtype=self.wallets.dtype)
+        wallets[:, 0] = self.wallets
+        self.bets[:] = 5
+
+        for r in range(num_rounds):
+            if not self.play_one(r, played, winners, player_scores, dealer_scores, bets):
+                wallets[:, r + 1:] = self.wallets[:, None]
+                break
+            wallets[:, r + 1] = self.wallets
+        return BatchResult(played, winners, player_scores, dealer_scores, bets, wallets)
+
+    def play_one(self, r, played, winners, player_scores, dealer_scores, bets):
+        """
+        Plays round `r`, writing its outcome into column `r` of the result
+        arrays. Returns False if the round could not be dealt.
+        """
+        deck = self.Deck
+        self.bets = np.maximum(self.bets, 5)
+        if deck.needs_reshuffle():
+            deck.reshuffle(**self.shuffle_counts())
+        seated = np.flatnonzero(self.wallets >= self.bets)
+        needed = 2 * (len(seated) + 1)
+        if len(seated) == 0 or deck.remaining() < needed:
+            return False
+        self.num_games += 1
+        deck.shuffle(**self.shuffle_counts())
+
+        # Two passes of one card to each seat, then the dealer.
+        faces = np.array([card.code for card in deck.cards[:needed]]) % DECK_SIZE
+        first, second = faces[:needed // 2], faces[needed // 2:]
+        hard = CARD_VALUES[first] + CARD_VALUES[second]
+        aces = CARD_ACES[first] + CARD_ACES[second]
+        deck.position = needed
+        if deck.counter is not None:
+            for card in deck.cards[:needed]:
+                deck.counter.see(card)
+
+        thresholds = self.stand_thresholds[seated]
+        hitting = np.flatnonzero(BatchBlackjack.calculate_score(hard[:-1], aces[:-1]) < thresholds)
+        hard_totals, ace_counts = hard.tolist(), aces.tolist()
+        for seat in hitting.tolist():
+            Table.hit(deck, hard_totals, ace_counts, seat, int(thresholds[seat]))
+        Table.hit(deck, hard_totals, ace_counts, -1, 17)
+
+        scores = BatchBlackjack.calculate_score(np.array(hard_totals), np.array(ace_counts))
+        player_score, dealer_score = scores[:-1], scores[-1]
+        winner = BatchBlackjack.determine_winner(player_score, dealer_score)
+        stake = self.bets[seated]
+        played[seated, r] = True
+        winners[seated, r] = winner
+        player_scores[seated, r] = player_score
+        dealer_scores[seated, r] = dealer_score
+        bets[seated, r] = stake
+        self.wallets[seated] += winner * stake
+        self.bets[seated] += winner * 5
+        return True
+
+    def hit(deck, hard_totals, ace_counts, seat, stand_threshold):
+        """
+        Deals cards off `deck` to hand `seat` until its score reaches
+        `stand_threshold` or the deck runs out.
+        """
+        hard, aces = hard_totals[seat], ace_counts[seat]
+        cards, start, end = deck.cards, deck.position, len(deck.cards)
+        position = start
+        while position < end:
+            score = hard + 10 if aces and hard + 10 <= 21 else hard
+            if score >= stand_threshold:
+                break
+            face = cards[position].code % DECK_SIZE
+            hard += FACE_VALUES[face]
+            aces += FACE_ACES[face]
+            position += 1
+        hard_totals[seat], ace_counts[seat] = hard, aces
+        deck.position = position
+        if deck.counter is not None:
+            for card in cards[start:position]:
+                deck.counter.see(card)